@@ -1,18 +1,69 @@
 # 1.8.2023
 
+import argparse
+import cProfile
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import webbrowser
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import openpyxl
 import numpy as np
 import plotly.graph_objects as go
 import re
-import tkinter as tk
-import tkinter.filedialog as filedialog
-from tkinter import messagebox
+import warnings
 
-DATAFRAMES = ['VSWR','RTWP','RSSI','ETP'] 
+DATAFRAMES = ['VSWR','RTWP','RSSI','ETP']
 DATETIME_FORMAT_CSV = '="%d.%m.%Y %H:%M:%S"'
 DATETIME_FORMAT_XLXS = '%d.%m.%Y %H:%M:%S'
 SEPARATOR = ','
+EXPORT_EXTENSIONS = ('.csv', '.xlsx')
+CACHE_MAX_BYTES = 1024 * 1024 * 1024 # Memory limit of the parsed file cache
+MISSING_VALUES = ['-', '', 'None', 'nan'] # Cells without a measurement
+MISSING_CELLS = frozenset(MISSING_VALUES + [None])
+VALUE_DTYPE = np.float32 # The measurements have at most a few decimals, float32 halves the memory of float64
+VALUE_DECIMALS = 3 # The float32 values are rounded to this many decimals when converted back to float64 for plotting
+CONVERTED_DIR = os.environ.get('ANTL_CONVERTED_DIR') # Directory for the converted exports, None disables them
+CONVERTED_FORMAT_VERSION = 1
+LOAD_WORKERS = int(os.environ.get('ANTL_LOAD_WORKERS', min(4, os.cpu_count() or 1))) # Processes for loading several files, 1 loads them one by one
+LOAD_POLL_MS = 100 # How often the GUI checks if the files have been loaded
+RMOD_PATTERN = r'^RMOD-(\d+)/' # The radio number in the 'Radio module' cells e.g. 'RMOD-11/RMOD_R-1(AHPMDD)'
+ANTENNA_PATTERN = r'^ANT(\d+)' # The antenna number in the 'Antenna/Port' cells e.g. 'ANT1'
+WEBGL_POINTS = int(os.environ.get('ANTL_WEBGL_POINTS', 200000)) # Figures with more points than this are drawn with WebGL (Scattergl)
+MAX_TRACE_POINTS = int(os.environ.get('ANTL_MAX_TRACE_POINTS', 4000)) # Longer series are decimated to this many points per trace, 0 disables
+# Default limits of the analysis mode in the plotted units (ETP in W), a row is flagged when a value is above 'max' or below 'min',
+# when the share of the missing ('-') samples is above 'max_missing' (0-1) or when it has more than 'max_gaps' runs of missing samples
+ANALYSIS_LIMITS = {
+    'VSWR': {'max': 1.5},
+    'RTWP': {'max': -90},
+    'RSSI': {'max': -50},
+    'ETP': {'min': 0.1, 'max_gaps': 0}, # Any dropout of the transmit power is flagged
+}
+LIMIT_KEYS = ['min', 'max', 'max_missing', 'max_gaps']
+ANALYSIS_PERCENTILES = [5, 50, 95]
+REPORT_FILENAME = 'antenna_line_report.csv'
+FOLLOW_INTERVAL_S = int(os.environ.get('ANTL_FOLLOW_INTERVAL', 10)) # How often the followed files are checked for new data, the exports sample every 10 s
+PROFILE_PATH = os.environ.get('ANTL_PROFILE') # Json file for the stage timings, setting it turns the profiling on, see StageProfiler
+PROFILE_MEMORY = os.environ.get('ANTL_PROFILE_MEMORY', '1') != '0' # Measure the peak memory while profiling, 0 records only the times
+CPROFILE_PATH = os.environ.get('ANTL_CPROFILE') # File for the cProfile statistics of the whole run, None disables
+ALIGN_STEP_S = int(os.environ.get('ANTL_ALIGN_STEP', 10)) # Grid step of the files aligned on the time, see align_sections
+PLOT_COLORS = ['red', 'blue', 'green', 'purple', 'orange', 'pink', 'brown', 'gray', 'navy','darkgreen', 'maroon', 'darkorange', 'indigo', 'chocolate', 'deeppink', 'dimgray']
+PLOT_LINE_STYLES = ['longdash', 'longdashdot', 'dot', 'dash', 'solid', 'dashdot']
+# Make configuration for each name value inside a config dictionary
+PLOT_CONFIG = {
+    'VSWR': {'title': 'VSWR by Time', 'yaxis_title': 'VSWR'},
+    'RTWP': {'title': 'RTWP by Time', 'yaxis_title': 'RTWP (dBm)', 'yaxis_range': [-110, -50], 'yaxis_dtick': 5},
+    'RSSI': {'title': 'RSSI by Time', 'yaxis_title': 'RSSI (dBm)', 'yaxis_range': [-110, 5], 'yaxis_dtick': 5},
+    'ETP': {'title': 'ETP by Time', 'yaxis_title': 'ETP (W)', 'yaxis_range': [0, 30], 'yaxis_dtick': 1},
+}
 
 def parse_config(config, parameter : str, is_int : bool = False, is_bool : bool = False):
     '''
@@ -20,10 +71,10 @@ def parse_config(config, parameter : str, is_int : bool = False, is_bool : bool
 
     param: config; ConfigParser object
     param: parameter; string, the name of the parameter in the config file
-    param: is_int; boolean, True if the value of the parameter in config file is supposed to be int, 
-                            False else 
-    param: is_int; boolean, True if the value of the parameter in config file is supposed to be boolean, 
-                            False else 
+    param: is_int; boolean, True if the value of the parameter in config file is supposed to be int,
+                            False else
+    param: is_int; boolean, True if the value of the parameter in config file is supposed to be boolean,
+                            False else
     '''
     if(is_int):
         return int(config['CONFIG'][parameter].split('#')[0].strip())
@@ -31,20 +82,1286 @@ def parse_config(config, parameter : str, is_int : bool = False, is_bool : bool
         return bool(config['CONFIG'][parameter].split('#')[0].strip())
     else:
         return config['CONFIG'][parameter].split('#')[0].strip()
-    
+
 def infer_datetime_format(dt_str): # Infer the datetime format based on the datetime string content in the dataframe
         if dt_str.startswith('="'):
             return DATETIME_FORMAT_CSV
         return DATETIME_FORMAT_XLXS
 
-class DataReader:
-    def __init__(self,dataframe_names):
+def parse_timestamps(timestamps): # Parses the timestamp header cells into a datetime64 array in one call
+    if isinstance(timestamps[0], str):
+        return pd.to_datetime(pd.Index(timestamps), format=infer_datetime_format(timestamps[0])).to_numpy(dtype='datetime64[ns]')
+    return pd.to_datetime(pd.Index(timestamps)).to_numpy(dtype='datetime64[ns]') # Excel may store the header cells as dates
+
+def detect_separator(filename_path): # Raw WebEM exports use commas, csv files saved again from Excel use semicolons
+    with open(filename_path, 'r', encoding='utf-8-sig') as file:
+        first_line = file.readline()
+    return ';' if ';' in first_line else SEPARATOR
+
+def parse_filter_strings(rmod_input : str, antenna_input : str):
+    '''
+    parse_filter_strings: Function for parsing the radio and antenna filter strings, the syntax is explained in Instructions_for_antenna_line_reader.txt
+
+    param: rmod_input; string, radios separated by commas e.g. '1,4,5'
+    param: antenna_input; string, antennas of a radio separated by commas and radios separated by semicolons e.g. '1,2;2,3;'
+
+    Raises ValueError if the strings contain something else than numbers, commas or semicolons
+    Returns the rmod filter list of radio numbers and the list of antenna number lists
+    '''
+    rmod_input = rmod_input.replace(' ', '')
+    antenna_input = antenna_input.replace(' ', '')
+
+    if not all(c.isdigit() or c in [',', ';'] for c in rmod_input) or not all(c.isdigit() or c in [',', ';'] for c in antenna_input):
+        raise ValueError("The input field(s) contain something else than numbers, commas or semicolons")
+
+    # Parse the rmod and antenna filteration data from the input strings
+    rmod_filter = [int(item) for item in rmod_input.split(',') if item]
+    antenna_filter_parts = [part for part in antenna_input.split(';') if part]
+    antenna_filter_list = [[int(item) for item in part.split(',') if item] for part in antenna_filter_parts]
+
+    return rmod_filter, antenna_filter_list
+
+def parse_limit_strings(limit_inputs, limits=None):
+    '''
+    parse_limit_strings: Function for parsing the analysis limits, e.g. ['VSWR:max=1.4', 'ETP:min=0.5,max=40', 'RTWP:max_missing=0.1']
+
+    param: limit_inputs; list of strings, a section name, colon and comma separated values of the LIMIT_KEYS. An empty value removes the limit
+    param: limits; dict, the limits which are updated, ANALYSIS_LIMITS if not given
+
+    Raises ValueError if a string is not in the format
+    Returns a new dict of the limits by the section name
+    '''
+    limits = {name: dict(name_limits) for name, name_limits in (ANALYSIS_LIMITS if limits is None else limits).items()}
+    for limit_input in limit_inputs:
+        name, _, items = limit_input.replace(' ', '').partition(':')
+        name = name.upper()
+        if name not in DATAFRAMES or not items:
+            raise ValueError(f"Invalid limit '{limit_input}', use e.g. 'VSWR:max=1.5'")
+        for item in items.split(','):
+            key, _, value = item.partition('=')
+            if key not in LIMIT_KEYS:
+                raise ValueError(f"Invalid limit '{limit_input}', the supported limits are {', '.join(LIMIT_KEYS)}")
+            if value:
+                limits.setdefault(name, {})[key] = float(value)
+            else:
+                limits.setdefault(name, {}).pop(key, None)
+    return limits
+
+def list_export_files(input_dir): # Lists the csv and xlsx exports in a directory in alphabetical order
+    return sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir)
+                  if name.lower().endswith(EXPORT_EXTENSIONS) and not name.startswith('~$'))
+
+def expand_input_paths(input_paths): # The exports of the given paths, a directory is replaced with the exports in it
+    file_paths = []
+    for path in input_paths:
+        file_paths.extend(list_export_files(path) if os.path.isdir(path) else [path])
+    return file_paths
+
+def path_hash(path, length=8): # A short hash of the absolute path, keeps the outputs of same named exports in different directories apart
+    return hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:length]
+
+def output_base_names(file_paths):
+    '''
+    output_base_names: Returns the prefix of the output files of each export by the path. The prefix is the filename with the
+    extension kept, so test.csv and test.xlsx do not overwrite each other. Exports with the same filename in different directories
+    get a short hash of the path after it, like the converted bundles
+    '''
+    base_names = {path: os.path.basename(path).replace('.', '_') for path in file_paths}
+    counts = {}
+    for base_name in base_names.values():
+        counts[base_name] = counts.get(base_name, 0) + 1
+    return {path: base_name if counts[base_name] == 1 else f"{base_name}_{path_hash(path)}"
+            for path, base_name in base_names.items()}
+
+def file_signature(path): # The modification time and size tell if the file has changed since it was parsed
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def to_float(cell): # Converts one cell of any type to a float, the missing and unparseable cells are nan
+    if isinstance(cell, (int, float)):
+        return cell
+    text = '' if cell is None else str(cell).strip()
+    if text in MISSING_CELLS:
+        return np.nan
+    try:
+        return float(text.replace(',', '.'))
+    except ValueError:
+        return np.nan
+
+def to_float_matrix(rows, dtype=np.float64):
+    '''
+    to_float_matrix: Converts the measurement cells into a contiguous float matrix. The cells are converted straight into the
+    matrix with np.fromiter, without an intermediate string array. Decimal commas are converted to points and the '-' and empty cells to nan
+
+    param: rows; list of lists, the measurement cells as strings (csv) or as strings and numbers (xlsx), all rows of the same length
+    param: dtype; numpy float type of the matrix
+    '''
+    width = len(rows[0]) if rows else 0
+    count = len(rows) * width
+    try: # Fast path for the csv cells, which are all strings
+        values = np.fromiter((np.nan if cell in MISSING_CELLS else float(cell.replace(',', '.')) for row in rows for cell in row), dtype=dtype, count=count)
+    except (AttributeError, TypeError, ValueError): # Numbers from xlsx or some other text in the cells
+        values = np.fromiter((to_float(cell) for row in rows for cell in row), dtype=dtype, count=count)
+    return values.reshape(len(rows), width)
+
+def column_numbers(column, pattern): # Parses the number of each row of a metadata column once per distinct string, -1 where the pattern does not match
+    categorical = column.astype('category')
+    numbers = categorical.cat.categories.astype(str).str.extract(pattern, expand=False).fillna(-1).astype(np.int64).to_numpy()
+    return np.append(numbers, -1)[categorical.cat.codes.to_numpy()] # The code -1 of a missing value picks the appended -1
+
+def decimation_width(columns, max_points): # The columns per bucket of decimate_minmax, 1 when a series this long is not decimated
+    if max_points <= 0 or columns <= max(max_points, 2):
+        return 1
+    return -(-columns // max(max_points // 3, 1)) # Rounded up
+
+def decimate_minmax(x, values, max_points, width=None):
+    '''
+    decimate_minmax: Peak preserving decimation of all the rows of a value matrix at once. The columns are split into
+    equal buckets and the minimum, the maximum and the first missing value of each row in each bucket are kept in time order,
+    so short spikes and short gaps stay visible
+
+    param: x; numpy array, the x value of each column
+    param: values; numpy array, a row for each series and a column for each x value, nan for the missing values
+    param: max_points; int, the maximum number of points per row, 0 or less to not decimate
+    param: width; int, the columns per bucket, None to size the buckets for max_points. A given width decimates the new
+    columns of a followed series with the buckets it was first decimated with
+
+    Returns (x, values, decimated), where x is a matrix with the x values of each row and decimated tells if the rows were shortened
+    '''
+    rows, columns = values.shape
+    width = decimation_width(columns, max_points) if width is None else width
+    if width <= 1:
+        return np.broadcast_to(x, values.shape), values, False
+    buckets = -(-columns // width)
+    padded = np.full((rows, buckets * width), np.nan, dtype=values.dtype)
+    padded[:, :columns] = values
+    padded = padded.reshape(rows, buckets, width)
+    missing = np.isnan(padded)
+    # Missing values never win, a bucket with only missing values picks its first column and stays a gap
+    min_index = np.argmin(np.where(missing, np.inf, padded), axis=2)
+    max_index = np.argmax(np.where(missing, -np.inf, padded), axis=2)
+    # The first missing value of a bucket is kept as a break in the line, the padding after the last column is not a gap
+    gaps = missing & (np.arange(buckets * width) < columns).reshape(buckets, width)
+    gap_index = np.where(gaps.any(axis=2), np.argmax(gaps, axis=2), max_index)
+    bucket_start = np.arange(buckets)[np.newaxis, :, np.newaxis] * width
+    positions = (bucket_start + np.sort(np.stack([min_index, max_index, gap_index], axis=2), axis=2)).reshape(rows, -1)
+    return np.asarray(x)[positions], np.take_along_axis(values, positions, axis=1), True
+
+def metadata_column_count(name): # The ETP section has the radio module and cells columns, the others also have the band/carrier column
+    return 2 if name == 'ETP' else 3
+
+class SectionData:
+    '''
+    SectionData: One parsed section of an export in a compact column oriented form. The metadata columns ('Radio module',
+    'Antenna/Port', ...) are categorical, so each distinct string is stored once. The measurements are a float32 matrix with
+    a row for each metadata row and a column for each timestamp, and the timestamps are an int64 array of epoch seconds
+
+    param: name; string, the section name
+    param: metadata; pandas DataFrame, the categorical metadata columns with a RangeIndex
+    param: epoch; numpy int64 array, the timestamps as seconds since 1.1.1970
+    param: values; numpy float32 array, the measurements, nan where the export had '-'
+
+    The rows are indexed by the radio and antenna numbers when the section is made, so the filters are lookups instead of string matching
+    '''
+    def __init__(self, name, metadata, epoch, values):
+        self.name = name
+        self.metadata = metadata
+        self.epoch = epoch
+        self.values = values
+        self.time_axis = None # (datetime64 array, seconds since the first sample), made on the first use
+        self.reused_columns = 0 # Leading timestamp columns taken over from the earlier version of a followed file
+        self.build_index()
+
+    def build_index(self): # Maps the radio numbers to their row positions and parses the antenna number of each row
+        self.rmod_numbers = column_numbers(self.metadata['Radio module'], RMOD_PATTERN)
+        self.antenna_numbers = column_numbers(self.metadata['Antenna/Port'], ANTENNA_PATTERN) if 'Antenna/Port' in self.metadata else None
+        rmods, first_rows = np.unique(self.rmod_numbers, return_index=True)
+        self.rmod_rows = {int(rmod): np.flatnonzero(self.rmod_numbers == rmod) for rmod in rmods[np.argsort(first_rows)]} # In the order of the export
+
+    def select_rows(self, rmod_filter, rmod_to_antenna):
+        '''
+        select_rows: Yields the row positions of each radio which passes the filters, in the order of the export
+
+        param: rmod_filter; collection of ints, the radio numbers, empty for all radios
+        param: rmod_to_antenna; dict, radio number -> collection of antenna numbers, a missing or empty entry keeps all antennas.
+                                The antennas are not filtered in sections without the 'Antenna/Port' column (ETP)
+        '''
+        rmod_filter = set(rmod_filter)
+        for rmod, rows in self.rmod_rows.items():
+            if rmod_filter and rmod not in rmod_filter:
+                continue
+            antennas = rmod_to_antenna.get(rmod)
+            if antennas and self.antenna_numbers is not None:
+                rows = rows[np.isin(self.antenna_numbers[rows], list(antennas))]
+            if len(rows):
+                yield rmod, rows
+
+    def get_time_axis(self): # Returns the timestamps as a datetime64 array and as seconds since the first sample
+        if self.time_axis is None:
+            datetimes = self.epoch.astype('datetime64[s]')
+            seconds = (self.epoch - self.epoch[0]).astype(np.float64)
+            self.time_axis = (datetimes, seconds)
+        return self.time_axis
+
+    def get_values(self, positions): # Returns the rows of the value matrix at the positions as float64, rounded to drop the float32 noise
+        return self.values[positions].astype(np.float64).round(VALUE_DECIMALS)
+
+    def get_plot_values(self, positions): # Returns the rows like get_values in the plotted units, ETP is converted from mW to W
+        values = self.get_values(positions)
+        return values / 1000 if self.name == 'ETP' else values
+
+    def memory_usage(self): # Returns the approximate memory usage in bytes
+        index_bytes = self.rmod_numbers.nbytes + (0 if self.antenna_numbers is None else self.antenna_numbers.nbytes)
+        return int(self.metadata.memory_usage(index=True, deep=True).sum() + self.values.nbytes + self.epoch.nbytes + index_bytes)
+
+    def to_dataframe(self): # Returns the section as one dataframe in the same layout as in the export
+        columns = pd.DatetimeIndex(self.get_time_axis()[0]).strftime(DATETIME_FORMAT_XLXS)
+        values = pd.DataFrame(self.get_values(slice(None)), columns=columns)
+        return pd.concat([self.metadata.astype(str), values], axis=1)
+
+def save_array(path, array):
+    # The array may be memory mapped from the file it replaces, so it is written to a temporary file first. The memory map keeps
+    # the replaced file alive, truncating it in place would break the map in the middle of the write
+    if isinstance(array, np.memmap) and array.filename and os.path.exists(path) and os.path.samefile(array.filename, path):
+        return # Already saved, Windows would not allow replacing a mapped file either
+    with open(path + '.tmp', 'wb') as file:
+        np.save(file, array)
+    os.replace(path + '.tmp', path)
+
+def save_sections(bundle_dir, sections, parsed_names, signature):
+    '''
+    save_sections: Saves the parsed sections as a bundle of .npy files and a json file, which can be loaded back with memory mapping
+
+    param: bundle_dir; string, the directory of the bundle, created if missing
+    param: sections; dict of SectionData by the section name
+    param: parsed_names; iterable of strings, the sections which were parsed, including the ones with no data
+    param: signature; tuple, the file_signature of the export the sections were parsed from
+    '''
+    os.makedirs(bundle_dir, exist_ok=True)
+    info = {'version': CONVERTED_FORMAT_VERSION, 'signature': list(signature), 'parsed_names': sorted(parsed_names), 'sections': {}}
+    for name, section in sections.items():
+        columns = []
+        for column_index, column in enumerate(section.metadata.columns):
+            categorical = section.metadata[column].astype('category')
+            save_array(os.path.join(bundle_dir, f"{name}_codes_{column_index}.npy"), categorical.cat.codes.to_numpy())
+            columns.append({'name': str(column), 'categories': [str(category) for category in categorical.cat.categories]})
+        save_array(os.path.join(bundle_dir, f"{name}_epoch.npy"), section.epoch)
+        save_array(os.path.join(bundle_dir, f"{name}_values.npy"), section.values)
+        info['sections'][name] = {'columns': columns}
+    # The json file is written last and replaced atomically, so a bundle without it is never loaded half written
+    with open(os.path.join(bundle_dir, 'sections.json.tmp'), 'w') as file:
+        json.dump(info, file)
+    os.replace(os.path.join(bundle_dir, 'sections.json.tmp'), os.path.join(bundle_dir, 'sections.json'))
+
+def load_sections(bundle_dir, mmap_mode='r'):
+    '''
+    load_sections: Loads the sections saved with save_sections, the value matrices are memory mapped
+
+    param: bundle_dir; string, the directory of the bundle
+    param: mmap_mode; passed to numpy.load, None reads the values into memory
+
+    Returns (sections, parsed_names, signature), or None if there is no bundle in the directory
+    '''
+    info_path = os.path.join(bundle_dir, 'sections.json')
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, 'r') as file:
+        info = json.load(file)
+    if info.get('version') != CONVERTED_FORMAT_VERSION:
+        return None
+    sections = {}
+    for name, section_info in info['sections'].items():
+        metadata = pd.DataFrame({
+            column['name']: pd.Categorical.from_codes(np.load(os.path.join(bundle_dir, f"{name}_codes_{column_index}.npy")), column['categories'])
+            for column_index, column in enumerate(section_info['columns'])})
+        epoch = np.load(os.path.join(bundle_dir, f"{name}_epoch.npy"))
+        values = np.load(os.path.join(bundle_dir, f"{name}_values.npy"), mmap_mode=mmap_mode)
+        sections[name] = SectionData(name, metadata, epoch, values)
+    return sections, frozenset(info['parsed_names']), tuple(info['signature'])
+
+def converted_bundle_dir(converted_dir, filename_path): # The bundle of an export, the path hash keeps same named exports apart
+    return os.path.join(converted_dir, f"{os.path.basename(filename_path)}_{path_hash(filename_path, 12)}")
+
+def section_statistics(section, limits=None, positions=slice(None)):
+    '''
+    section_statistics: Computes the statistics of each row of a section in one pass over the value matrix
+
+    param: section; SectionData
+    param: limits; dict, 'min' and/or 'max' limit in the plotted units (ETP in W), 'max_missing' share of the missing samples (0-1)
+                   and 'max_gaps' count of the runs of missing samples, None for no limits
+    param: positions; row positions to include, all rows by default
+
+    Returns a dataframe with the metadata columns and for each row the sample count, the missing ('-') samples, the gaps
+    (runs of missing samples), min/mean/max, the percentiles, the time in seconds above the max and below the min limit,
+    and 'flagged' which is True if any value is outside the limits or the row has more missing samples or gaps than allowed.
+    A row without any values has a missing share of 1 and one gap
+    '''
+    limits = limits or {}
+    values = section.get_plot_values(positions)
+    missing = np.isnan(values)
+    # Each sample lasts until the next one, the last one as long as the typical interval
+    epoch = section.epoch.astype(np.float64)
+    interval = np.median(np.diff(epoch)) if len(epoch) > 1 else 0.0
+    durations = np.diff(epoch, append=epoch[-1] + interval) if len(epoch) else epoch
+
+    report = section.metadata.iloc[positions].reset_index(drop=True).astype(str)
+    report['samples'] = values.shape[1]
+    report['missing'] = missing.sum(axis=1)
+    report['gaps'] = (missing & ~np.pad(missing, ((0, 0), (1, 0)))[:, :-1]).sum(axis=1) # A gap starts where a missing value follows a value
+    with warnings.catch_warnings(): # Rows without any values give nan statistics
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        report['min'] = np.nanmin(values, axis=1) if values.size else np.nan
+        report['mean'] = np.nanmean(values, axis=1) if values.size else np.nan
+        report['max'] = np.nanmax(values, axis=1) if values.size else np.nan
+        percentiles = np.nanpercentile(values, ANALYSIS_PERCENTILES, axis=1) if values.size else np.full((len(ANALYSIS_PERCENTILES), len(report)), np.nan)
+    for percentile, percentile_values in zip(ANALYSIS_PERCENTILES, percentiles):
+        report[f'p{percentile}'] = percentile_values
+
+    flagged = np.zeros(len(report), dtype=bool)
+    if 'max' in limits:
+        above = values > limits['max'] # nan compares as False
+        report['above_max_s'] = above @ durations
+        flagged |= above.any(axis=1)
+    if 'min' in limits:
+        below = values < limits['min']
+        report['below_min_s'] = below @ durations
+        flagged |= below.any(axis=1)
+    if 'max_missing' in limits and values.shape[1]:
+        flagged |= report['missing'].to_numpy() / values.shape[1] > limits['max_missing']
+    if 'max_gaps' in limits:
+        flagged |= report['gaps'].to_numpy() > limits['max_gaps']
+    report['flagged'] = flagged
+    return report
+
+class AlignedSection:
+    '''
+    AlignedSection: The same section of several files resampled onto one time grid, so the files can be plotted, diffed and
+    exported as one array. The rows with the same metadata (radio module, antenna/port, band or carrier) are joined across the files
+
+    param: name; string, the section name
+    param: filenames; list of strings, the processed filenames, the first axis of values
+    param: metadata; pandas DataFrame, the metadata of the joined rows as strings with a RangeIndex, the second axis of values
+    param: grid; numpy int64 array, the start of each grid step as epoch seconds, or as seconds since the first sample of each file when relative
+    param: values; numpy float array of shape (files, rows, steps) in the plotted units, nan where a file has no samples
+    param: step; int, the grid step in seconds
+    param: relative; boolean, True if each file was aligned on its own first sample instead of the clock time
+    param: first_timestamps; list of strings, the first timestamp of each file
+    param: reference; string, the filename the values are differences to (see diff), None for measured values
+    '''
+    def __init__(self, name, filenames, metadata, grid, values, step, relative, first_timestamps, reference=None):
+        self.name = name
+        self.filenames = filenames
+        self.metadata = metadata
+        self.grid = grid
+        self.values = values
+        self.step = step
+        self.relative = relative
+        self.first_timestamps = first_timestamps
+        self.reference = reference
+
+    def get_time_axis(self): # Returns the grid as datetimes, or as float seconds when relative
+        return self.grid.astype(np.float64) if self.relative else self.grid.astype('datetime64[s]')
+
+    def diff(self, reference=0):
+        '''
+        diff: Returns the differences of the other files to the reference file as a new AlignedSection, e.g. after - before a site change
+
+        param: reference; int, the position of the reference file in filenames
+        '''
+        others = [index for index in range(len(self.filenames)) if index != reference]
+        return AlignedSection(self.name, [self.filenames[index] for index in others], self.metadata, self.grid,
+                              self.values[others] - self.values[reference], self.step, self.relative,
+                              [self.first_timestamps[index] for index in others], self.filenames[reference])
+
+    def to_dataframe(self): # Returns the values as one dataframe, a row for each file and joined row and a column for each grid step
+        files, rows, steps = self.values.shape
+        if self.relative:
+            columns = [str(int(seconds)) for seconds in self.grid]
+        else:
+            columns = pd.DatetimeIndex(self.get_time_axis()).strftime(DATETIME_FORMAT_XLXS)
+        metadata = pd.concat([self.metadata] * files, ignore_index=True)
+        metadata.insert(0, 'file', np.repeat(self.filenames, rows))
+        values = pd.DataFrame(self.values.reshape(files * rows, steps).round(VALUE_DECIMALS), columns=columns)
+        return pd.concat([metadata, values], axis=1)
+
+def align_sections(name, sections, positions=None, step=ALIGN_STEP_S, relative=False):
+    '''
+    align_sections: Resamples the same section of several files onto a common time grid. The samples are put into the grid
+    steps they fall in and averaged when a step has several of them, the steps without samples are nan. The grid covers only
+    the time spans of the files, captures from different days do not make a grid of the days between them. One nan step
+    is left between separate spans, so the lines break there
+
+    param: name; string, the section name
+    param: sections; dict of SectionData by the processed filename, in the order of the files
+    param: positions; dict of the row positions to include by the filename, all rows of a file which is not in it
+    param: step; int, the grid step in seconds. The absolute grid starts on a multiple of step, e.g. 10:45:30 with 10 s
+    param: relative; boolean, align the files on their first samples instead of the clock time, e.g. before and after a site change on different days
+
+    Returns an AlignedSection, or None if none of the sections have timestamps
+    '''
+    positions = positions or {}
+    sections = {filename: section for filename, section in sections.items() if len(section.epoch)}
+    if not sections:
+        return None
+    step = max(int(step), 1)
+    epochs = {filename: section.epoch - section.epoch[0] if relative else section.epoch for filename, section in sections.items()}
+    # The grid steps are counted from 1.1.1970, the spans of the files are merged where they overlap or touch
+    spans = sorted((int(epoch.min()) // step, int(epoch.max()) // step) for epoch in epochs.values())
+    merged = [list(spans[0])]
+    for span_start, span_end in spans[1:]:
+        if span_start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], span_end)
+        else:
+            merged.append([span_start, span_end])
+    grid_steps = np.concatenate([np.arange(span_start, span_end + (2 if index < len(merged) - 1 else 1), dtype=np.int64) # The extra step is the break
+                                 for index, (span_start, span_end) in enumerate(merged)])
+    grid = grid_steps * step
+
+    # The rows are joined on all of their metadata columns, in the order they are first seen
+    metadatas = {filename: section.metadata.iloc[positions.get(filename, slice(None))].astype(str).reset_index(drop=True) for filename, section in sections.items()}
+    metadata = pd.concat(list(metadatas.values()), ignore_index=True).drop_duplicates(ignore_index=True)
+    key_index = pd.MultiIndex.from_frame(metadata)
+
+    values = np.full((len(sections), len(metadata), len(grid)), np.nan, dtype=np.float64)
+    for file_index, (filename, section) in enumerate(sections.items()):
+        rows = key_index.get_indexer(pd.MultiIndex.from_frame(metadatas[filename]))
+        file_values = section.get_plot_values(positions.get(filename, slice(None)))
+        # The samples are sorted into their grid steps and summed per step in one reduceat call
+        steps = np.searchsorted(grid_steps, epochs[filename] // step) # Every sample is inside the span of its file
+        order = np.argsort(steps, kind='stable')
+        used_steps, starts = np.unique(steps[order], return_index=True)
+        valid = ~np.isnan(file_values[:, order])
+        sums = np.add.reduceat(np.where(valid, file_values[:, order], 0.0), starts, axis=1)
+        counts = np.add.reduceat(valid, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values[file_index][np.ix_(rows, used_steps)] = np.where(counts > 0, sums / counts, np.nan)
+    first_timestamps = [pd.Timestamp(section.epoch[0], unit='s').strftime('%d.%m.%Y %H:%M:%S') for section in sections.values()]
+    return AlignedSection(name, list(sections), metadata, grid, values, step, relative, first_timestamps)
+
+def sections_memory_usage(sections): # Returns the approximate memory usage of the parsed sections in bytes
+    return sum(section.memory_usage() for section in sections.values())
+
+class ParsedFileCache:
+    '''
+    ParsedFileCache: Least recently used cache of parsed exports. An entry is keyed by the absolute path and it is
+    valid as long as the modification time and size of the file stay the same. The least recently used entries are
+    evicted when the total memory usage of the cached sections exceeds max_bytes, the newest entry is always kept.
+
+    param: max_bytes; int, the memory limit of the cached sections in bytes
+    '''
+    def __init__(self, max_bytes : int = CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # path -> (file signature, sections, parsed section names, size in bytes)
+        self.total_bytes = 0
+
+    def get(self, path): # Returns the cached (sections, parsed section names) of the file, or None if the file is not cached or has changed
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            signature = file_signature(key)
+        except OSError:
+            signature = None
+        if signature != entry[0]:
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, path, sections, parsed_names, signature=None): # Stores the sections of the file and evicts the least recently used entries if over the limit
+        key = os.path.abspath(path)
+        self.remove(key)
+        size = sections_memory_usage(sections)
+        self.entries[key] = (signature or file_signature(key), sections, frozenset(parsed_names), size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, path):
+        entry = self.entries.pop(os.path.abspath(path), None)
+        if entry is not None:
+            self.total_bytes -= entry[3]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+class NoStage: # Stands in for ProfiledStage when the profiling is off, so a disabled stage costs only a function call
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def set(self, **counts):
+        pass
+
+NO_STAGE = NoStage()
+
+class ProfiledStage:
+    '''
+    ProfiledStage: Context manager made by StageProfiler.stage, measures the block it wraps. The counts such as rows and columns
+    can be given when the stage is made or with set() inside the block, when they are known only after the work
+    '''
+    def __init__(self, profiler, stage, file, section, counts):
+        self.profiler = profiler
+        self.record = {'stage': stage, 'file': file, 'section': section, **counts}
+        self.start = 0.0
+        self.child_seconds = 0.0 # Time spent in the nested stages
+        self.start_bytes = 0
+        self.peak_bytes = 0 # Highest traced memory seen so far, the nested stages reset the tracemalloc peak
+
+    def set(self, **counts):
+        self.record.update(counts)
+
+    def __enter__(self):
+        self.profiler.enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.profiler.exit(self, exc_type)
+        return False
+
+class StageProfiler:
+    '''
+    StageProfiler: Records the wall time, the row and column counts and the peak memory of the processing stages of each file.
+    The stages nest, a stage without a file or section takes them from the stage around it. A record has the total 'seconds',
+    the 'self_seconds' without the nested stages (e.g. the section splitting of a 'read' stage) and 'peak_bytes', the highest
+    memory allocated by Python above the level at the start of the stage
+
+    param: enabled; boolean, False makes stage() return NO_STAGE until enable() is called
+    param: trace_memory; boolean, measure the peak memory with tracemalloc, which makes the profiled run a few times slower
+    '''
+    def __init__(self, enabled=False, trace_memory=PROFILE_MEMORY):
+        self.enabled = False
+        self.trace_memory = trace_memory
+        self.records = []
+        self.lock = threading.Lock() # The GUI loads the files in a background thread
+        self.local = threading.local() # The open stages of each thread
+        self.started_tracing = False
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def clear(self):
+        with self.lock:
+            self.records = []
+
+    def stage(self, stage, file=None, section=None, **counts): # Returns the context manager measuring a stage, e.g. with PROFILER.stage('read', path) as stage: ...
+        if not self.enabled:
+            return NO_STAGE
+        return ProfiledStage(self, stage, file, section, counts)
+
+    def open_stages(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def enter(self, stage):
+        stack = self.open_stages()
+        if stack:
+            parent = stack[-1]
+            stage.record['file'] = stage.record['file'] or parent.record['file']
+            stage.record['section'] = stage.record['section'] or parent.record['section']
+        if tracemalloc.is_tracing():
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            if stack: # The peak is reset for this stage, the stage around it keeps what it has seen so far
+                stack[-1].peak_bytes = max(stack[-1].peak_bytes, peak_bytes)
+            tracemalloc.reset_peak()
+            stage.start_bytes = stage.peak_bytes = current_bytes
+        stack.append(stage)
+        stage.start = time.perf_counter()
+
+    def exit(self, stage, exc_type):
+        seconds = time.perf_counter() - stage.start
+        stack = self.open_stages()
+        stack.pop()
+        record = stage.record
+        record['seconds'] = round(seconds, 6)
+        record['self_seconds'] = round(seconds - stage.child_seconds, 6)
+        if tracemalloc.is_tracing():
+            stage.peak_bytes = max(stage.peak_bytes, tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = stage.peak_bytes - stage.start_bytes
+        record['depth'] = len(stack)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        if stack:
+            stack[-1].child_seconds += seconds
+            stack[-1].peak_bytes = max(stack[-1].peak_bytes, stage.peak_bytes)
+        with self.lock:
+            self.records.append(record)
+
+    def summary(self): # Returns the records and the totals by the stage name as a json serializable dict
+        with self.lock:
+            records = list(self.records)
+        stages = {}
+        for record in records:
+            totals = stages.setdefault(record['stage'], {'count': 0, 'seconds': 0.0, 'self_seconds': 0.0, 'peak_bytes': 0})
+            totals['count'] += 1
+            totals['seconds'] = round(totals['seconds'] + record['seconds'], 6)
+            totals['self_seconds'] = round(totals['self_seconds'] + record['self_seconds'], 6)
+            totals['peak_bytes'] = max(totals['peak_bytes'], record.get('peak_bytes', 0))
+        return {'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0], 'pid': os.getpid(),
+                'memory_traced': self.trace_memory, 'stages': stages, 'records': records}
+
+    def write_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file, indent=2, default=str)
+
+    def report(self): # Returns the records as a text table in the order the stages finished, the nested stages indented
+        lines = [f"{'stage':<24} {'seconds':>9} {'self':>9} {'MiB':>8} {'rows':>7} {'columns':>8}  file / section"]
+        for record in self.summary()['records']:
+            peak = f"{record['peak_bytes'] / 2**20:8.1f}" if 'peak_bytes' in record else f"{'-':>8}"
+            lines.append(f"{'  ' * record['depth'] + record['stage']:<24} {record['seconds']:9.3f} {record['self_seconds']:9.3f} {peak} "
+                         f"{record.get('rows', ''):>7} {record.get('columns', ''):>8}  {record['file'] or ''} {record['section'] or ''}".rstrip())
+        return '\n'.join(lines)
+
+PROFILER = StageProfiler(enabled=bool(PROFILE_PATH)) # The stages of this process are recorded here when the profiling is on
+
+class AntennaLineParser:
+    '''
+    AntennaLineParser: GUI-free parsing and plotting core. Parsed sections are stored in
+    self.dataframe_dict[filename][section], where filename is the processed filename and section is one of the dataframe_names.
+    Errors are raised as exceptions, the GUI (DataReader) reports them with message boxes.
+
+    param: dataframe_names; list of strings, the names of the sections in the order they appear in the export
+    param: cache; ParsedFileCache, parsed files are reused from it until the file changes, a new cache is created if not given
+    param: converted_dir; string, directory where the parsed files are saved in the binary format and loaded from
+                          when the same file is opened again, None to disable
+    '''
+    def __init__(self, dataframe_names, cache=None, converted_dir=CONVERTED_DIR):
         self.dataframe_names = dataframe_names
         self.dataframe_dict = {}
+        self.cache = cache if cache is not None else ParsedFileCache()
+        self.converted_dir = converted_dir
+        self.followed = {} # path -> (file signature, sections) of the files followed with refresh_file
+
+    def parse_file(self, filename_path, names=None): # Parses the export and returns the sections as a dict of SectionData
+        filename = self.process_filename(self.extract_filename(filename_path))
+        self.open_file(filename_path, filename, names)
+        return self.dataframe_dict[filename]
+
+    def open_file(self, filename_path, filename, names=None):
+        '''
+        open_file: Stores the sections of the file under the filename. The sections are taken from the cache or from the converted
+        binary bundle of the file if they are up to date, only the missing sections are read from the file
+
+        param: filename_path; string, path to the export
+        param: filename; string, the processed filename used as the key in self.dataframe_dict
+        param: names; list of strings, the sections needed, None for all of the dataframe_names
+        '''
+        names = self.dataframe_names if names is None else names
+        signature, sections, parsed_names = self.lookup_parsed(filename_path)
+        missing_names = [name for name in names if name not in parsed_names]
+        if missing_names:
+            sections = self.add_sections(filename_path, signature, sections, parsed_names, missing_names,
+                                         self.read_sections(filename_path, missing_names))
+        self.dataframe_dict[filename] = sections
+        return True
+
+    def file_labels(self, filename_paths):
+        '''
+        file_labels: Returns the key of each file in self.dataframe_dict by the path. The key is the processed filename, unless
+        different files have the same processed filename, e.g. test.csv and test.xlsx or two captures of the same BTS at the same
+        time of day. Then the filename is added, and a short hash of the path if also the filenames are the same
+        '''
+        labels = {path: self.process_filename(self.extract_filename(path)) for path in filename_paths}
+        for describe in [os.path.basename, path_hash]:
+            keys = list(labels.values())
+            labels = {path: f"{label} ({describe(path)})" if keys.count(label) > 1 else label for path, label in labels.items()}
+        return labels
+
+    def open_files(self, filename_paths, names=None, workers=LOAD_WORKERS, labels=None):
+        '''
+        open_files: Stores the sections of several files like open_file. The files which are not up to date in the cache are
+        read concurrently in a process pool when workers is above 1, a failure in one file does not stop the others
+
+        param: filename_paths; list of strings, paths to the exports
+        param: names; list of strings, the sections needed, None for all of the dataframe_names
+        param: workers; int, the maximum number of worker processes
+        param: labels; dict, the key of each file in self.dataframe_dict by the path, see file_labels. The processed filename by default
+
+        Returns a dict of the exceptions by the file path for the files that failed, the other files are in self.dataframe_dict
+        '''
+        names = self.dataframe_names if names is None else names
+        errors = {}
+        jobs = [] # (filename_path, filename, signature, sections, parsed_names, missing_names) of the files to be read
+        for filename_path in filename_paths:
+            filename = labels[filename_path] if labels else self.process_filename(self.extract_filename(filename_path))
+            try:
+                signature, sections, parsed_names = self.lookup_parsed(filename_path)
+            except Exception as e:
+                errors[filename_path] = e
+                continue
+            missing_names = [name for name in names if name not in parsed_names]
+            if missing_names:
+                jobs.append((filename_path, filename, signature, sections, parsed_names, missing_names))
+            else:
+                self.dataframe_dict[filename] = sections
+
+        self.store_read_jobs(jobs, run_file_jobs(read_sections_worker, [(self.dataframe_names, job[0], job[5]) for job in jobs], workers), errors)
+        return errors
+
+    def store_read_jobs(self, jobs, read_results, errors): # Stores the sections read for the jobs, read_results are functions returning the sections or raising the error
+        for job, read_result in zip(jobs, read_results):
+            filename_path, filename, signature, sections, parsed_names, missing_names = job
+            try:
+                self.dataframe_dict[filename] = self.add_sections(filename_path, signature, sections, parsed_names, missing_names, read_result())
+            except Exception as e:
+                errors[filename_path] = e
+
+    def lookup_parsed(self, filename_path): # Returns the (signature, sections, parsed_names) of the file from the cache or the converted bundle
+        signature = file_signature(filename_path)
+        cached = self.cache.get(filename_path)
+        if cached is None:
+            cached = self.load_converted(filename_path, signature)
+            if cached is not None:
+                self.cache.put(filename_path, *cached, signature)
+        sections, parsed_names = cached or ({}, frozenset())
+        return signature, sections, parsed_names
+
+    def add_sections(self, filename_path, signature, sections, parsed_names, read_names, read_sections): # Merges newly read sections to the earlier ones, caches and saves them
+        sections = {**sections, **read_sections}
+        parsed_names = parsed_names.union(read_names)
+        self.cache.put(filename_path, sections, parsed_names, signature)
+        self.save_converted(filename_path, sections, parsed_names, signature)
+        return sections
+
+    def load_converted(self, filename_path, signature): # Returns the (sections, parsed_names) of the converted bundle if it is up to date, else None
+        if not self.converted_dir:
+            return None
+        try:
+            with PROFILER.stage('load_converted', filename_path):
+                loaded = load_sections(converted_bundle_dir(self.converted_dir, filename_path))
+        except (OSError, ValueError, KeyError) as e: # A damaged bundle is parsed again from the file
+            print(f"Could not load the converted file of {filename_path}: {e}", file=sys.stderr)
+            return None
+        if loaded is None or loaded[2] != tuple(signature):
+            return None
+        return loaded[0], loaded[1]
+
+    def save_converted(self, filename_path, sections, parsed_names, signature): # Saves the sections into the converted bundle, failures only warn
+        if not self.converted_dir:
+            return
+        try:
+            with PROFILER.stage('save_converted', filename_path):
+                save_sections(converted_bundle_dir(self.converted_dir, filename_path), sections, parsed_names, signature)
+        except OSError as e:
+            print(f"Could not save the converted file of {filename_path}: {e}", file=sys.stderr)
+
+    def read_sections(self, filename_path, names, previous=None): # Reads the wanted sections of the export from the disk, see make_section for previous
+        with PROFILER.stage('read', filename_path) as stage:
+            sections = self.read_export(filename_path, names, previous)
+            if PROFILER.enabled: # The counts are not computed when they are not recorded
+                stage.set(rows=sum(section.values.shape[0] for section in sections.values()),
+                          columns=max((section.values.shape[1] for section in sections.values()), default=0))
+            return sections
+
+    def read_export(self, filename_path, names, previous): # Streams the export with the reader of its file type into split_sections
+        if filename_path.endswith(".csv"):
+            separator = detect_separator(filename_path)
+            with open(filename_path, 'r', newline='', encoding='utf-8-sig') as file:
+                # The lines are split into cells only for the wanted sections, the rest are only checked for section markers
+                return self.split_sections(file, names, previous,
+                                           first_cell=lambda line: line.split(separator, 1)[0].strip().strip('"'),
+                                           is_blank=lambda line: not line.strip().strip(separator),
+                                           to_rows=lambda lines: csv.reader(lines, delimiter=separator))
+        elif filename_path.endswith(".xlsx"):
+            # Read-only mode streams the rows of the sheet without building the whole workbook in memory
+            workbook = openpyxl.load_workbook(filename_path, read_only=True, data_only=True)
+            try:
+                sheet = workbook.worksheets[0]
+                sheet.reset_dimensions() # Files saved by other programs may have a wrong dimension, which would cut the rows short
+                return self.split_sections(sheet.iter_rows(values_only=True), names, previous,
+                                           first_cell=lambda row: '' if not row or row[0] is None else str(row[0]).strip(),
+                                           is_blank=lambda row: all(value is None or value == '' for value in row),
+                                           to_rows=lambda rows: rows)
+            finally:
+                workbook.close()
+        raise ValueError(f"Unsupported file type: {filename_path}")
+
+    def section_marker(self, cell): # Returns the section name if the cell is a section title such as 'RTWP (dBm)', else None
+        name = cell.split(' ', 1)[0].upper()
+        return name if name in self.dataframe_names else None
+
+    def split_sections(self, items, names, previous, first_cell, is_blank, to_rows):
+        '''
+        split_sections: Single pass section splitter. Walks the export line by line, detects the section titles and
+        collects the lines of the wanted sections. Reading stops as soon as all of the wanted sections have been seen.
+
+        param: items; iterable of the lines (csv) or rows (xlsx) of the export
+        param: names; list of strings, the wanted sections
+        param: previous; dict of SectionData by the section name from an earlier version of the file, or None, see make_section
+        param: first_cell; function returning the first cell of an item as a string
+        param: is_blank; function returning True if an item has no values, blank lines separate the sections
+        param: to_rows; function converting a list of items into lists of cells
+
+        Raises ValueError if the file does not start with a section title
+        Returns a dict of SectionData by the section name, sections with 'No data available' are left out
+        '''
+        wanted = set(names)
+        sections = {}
+        current = None # Name of the section being read
+        header = None
+        section_items = []
+
+        def finish_section():
+            if current in wanted and header is not None:
+                with PROFILER.stage('convert', section=current, rows=len(section_items)) as stage:
+                    sections[current] = self.make_section(current, header, to_rows(section_items), (previous or {}).get(current))
+                    if PROFILER.enabled:
+                        stage.set(columns=sections[current].values.shape[1])
+            wanted.discard(current)
+
+        for item in items:
+            cell = first_cell(item)
+            marker = self.section_marker(cell) if cell else None
+            if marker is not None:
+                finish_section()
+                if not wanted: # All of the wanted sections are read, the rest of the file is not needed
+                    return sections
+                current, header, section_items = marker, None, []
+            elif current is None:
+                if is_blank(item):
+                    continue
+                raise ValueError("The file does not start with a section title, it is not an antenna line export")
+            elif is_blank(item) or cell == 'No data available':
+                continue
+            elif header is None:
+                if current in wanted:
+                    header = next(iter(to_rows([item])))
+                else:
+                    header = []
+            elif current in wanted:
+                section_items.append(item)
+        if current is None:
+            raise ValueError("No sections were found, the file is not an antenna line export")
+        finish_section()
+        return sections
+
+    def make_section(self, name, header, rows, previous=None):
+        '''
+        make_section: Makes the SectionData of a section, the trailing empty columns are left out
+
+        param: name; string, the section name
+        param: header; list, the header row cells
+        param: rows; iterable of lists, the data row cells
+        param: previous; SectionData of the same section from an earlier version of the file, or None. If the file has the same
+                         rows and starts with the same timestamps, only the timestamp columns after them are converted
+        '''
+        header = list(header)
+        while header and (header[-1] is None or header[-1] == ''):
+            header.pop()
+        width = len(header)
+        columns_start = metadata_column_count(name)
+        rows = [list(row)[:width] for row in rows]
+        rows = [row + [''] * (width - len(row)) if len(row) < width else row for row in rows] # Pad the rows cut short
+        metadata = pd.DataFrame([row[:columns_start] for row in rows], columns=header[:columns_start]).astype('category')
+        reused = self.reusable_columns(previous, metadata, header[columns_start:])
+        new_start = columns_start + reused
+        values = to_float_matrix([row[new_start:] for row in rows], VALUE_DTYPE).reshape(len(rows), width - new_start)
+        epoch = parse_timestamps(header[new_start:]).astype('datetime64[s]').astype(np.int64) if width > new_start else np.empty(0, dtype=np.int64)
+        if reused:
+            metadata = previous.metadata
+            values = np.hstack([previous.values, values])
+            epoch = np.concatenate([previous.epoch, epoch])
+        section = SectionData(name, metadata, epoch, values)
+        section.reused_columns = reused
+        return section
+
+    def reusable_columns(self, previous, metadata, timestamps): # Returns how many timestamp columns of the previous section are still the same, 0 if the section has changed
+        if previous is None or not len(previous.epoch) or len(timestamps) < len(previous.epoch):
+            return 0
+        if not metadata.astype(str).equals(previous.metadata.astype(str)):
+            return 0
+        known = len(previous.epoch)
+        edges = parse_timestamps([timestamps[0], timestamps[known - 1]]).astype('datetime64[s]').astype(np.int64)
+        return known if edges[0] == previous.epoch[0] and edges[1] == previous.epoch[-1] else 0
+
+    def follow_file(self, filename_path, filename): # Starts following the file, the sections already in self.dataframe_dict are the starting point
+        self.followed[os.path.abspath(filename_path)] = (None, self.dataframe_dict.get(filename, {}))
+
+    def read_followed(self, filename_path, names):
+        '''
+        read_followed: Reads a followed file again if it has changed. Only the timestamp columns after the ones seen
+        earlier are converted, the earlier values are taken over. Does not change the state of the parser, so it can run in a background thread
+
+        Returns (signature, sections, names), or None if the file has not changed
+        '''
+        signature = file_signature(filename_path)
+        previous_signature, previous = self.followed.get(os.path.abspath(filename_path), (None, {}))
+        if signature == previous_signature:
+            return None
+        return signature, self.read_sections(filename_path, names, previous), names
+
+    def store_followed(self, filename_path, filename, result):
+        '''
+        store_followed: Stores the result of read_followed into the followed state, the cache and self.dataframe_dict
+
+        Returns a dict of the number of new timestamp columns by the section name, None for a section which was parsed
+        from scratch because its rows changed, an empty dict if the file has not changed
+        '''
+        if result is None:
+            return {}
+        signature, sections, names = result
+        self.followed[os.path.abspath(filename_path)] = (signature, sections)
+        self.cache.put(filename_path, sections, names, signature)
+        # The sections which were read replace the earlier ones, also the ones which no longer have data
+        self.dataframe_dict[filename] = {**{name: section for name, section in self.dataframe_dict.get(filename, {}).items() if name not in names}, **sections}
+        return {name: len(section.epoch) - section.reused_columns if section.reused_columns else None for name, section in sections.items()}
+
+    def refresh_file(self, filename_path, filename, names=None): # Follow mode update of a file, returns the changes like store_followed
+        names = self.dataframe_names if names is None else names
+        return self.store_followed(filename_path, filename, self.read_followed(filename_path, names))
+
+    def extract_filename(self, file_path): # Extracts the filename from the path from the file
+        return os.path.basename(file_path).split('.')[0]
+
+    def process_filename(self, filename): # If the filename is the original, which WebEM returns, extract BTS id and time from it
+        if "ANTL" in filename:
+            partial_filename = filename[15:]
+            return partial_filename[:partial_filename.find("_")] + ":" + partial_filename[-4:]
+        return filename
+
+    def build_figure(self, name, filenames, rmod_filter, rmod_to_antenna, webgl_points=WEBGL_POINTS, max_trace_points=MAX_TRACE_POINTS):
+        '''
+        build_figure: Builds the plotly figure of the given section from the already parsed files. The traces of all
+        the files are collected first and the figure is made from them at once, the layout is set only once.
+        The selected rows of each file are decimated together with decimate_minmax when they are longer than max_trace_points
+
+        param: name; string, the section name, one of the dataframe_names
+        param: filenames; list of strings, processed filenames (keys of self.dataframe_dict) in the plotting order
+        param: rmod_filter; list of ints, the radio numbers e.g. [1, 4], empty list for all radios
+        param: rmod_to_antenna; dict, radio number -> list of antenna numbers, a missing or empty list for all antennas
+        param: webgl_points; int, the figure is drawn with Scattergl instead of Scatter when it has more points than this
+        param: max_trace_points; int, the maximum number of points per trace, 0 to draw every point
+
+        Returns the figure, or None if none of the files contain data for the section
+        '''
+        with PROFILER.stage('figure', section=name) as stage:
+            fig = self.collect_figure(name, filenames, rmod_filter, rmod_to_antenna, webgl_points, max_trace_points)
+            if fig is not None and PROFILER.enabled:
+                stage.set(rows=len(fig.data), columns=sum(len(trace.y) for trace in fig.data))
+            return fig
+
+    def collect_figure(self, name, filenames, rmod_filter, rmod_to_antenna, webgl_points, max_trace_points): # Collects the traces of build_figure and makes the figure of them
+        traces = [] # Keyword arguments of the traces
+        first_timestamps = []
+        filenames_in_order = []
+        max_time_value = 0
+        decimated = False
+
+        for order_num, filename in enumerate(filenames, 1): # Loop thru the filenames
+            if name not in self.dataframe_dict[filename]: # Check that the dataframe by the name exists
+                continue
+
+            # Get the section by the given name from the dict, the rows are filtered by the metadata dataframe
+            section = self.dataframe_dict[filename][name]
+            df = section.metadata
+
+            filenames_in_order.append(filename)
+            # Get details from the section
+            with PROFILER.stage('time_axis', filename, columns=len(section.epoch)):
+                time_datapoints, first_timestamp, rmod_column_name, second_column_name = self.get_data_details(section, name)
+            first_timestamps.append(first_timestamp)
+
+            if max_time_value < max(max_time_value, time_datapoints[-1]): # Keep track of the max_time_value across the dataframes in different files
+                    max_time_value = max(max_time_value, time_datapoints[-1])
+
+            # The rows of the radios which pass the filters are looked up from the index of the section and processed together
+            selected = list(section.select_rows(rmod_filter, rmod_to_antenna))
+            if not selected:
+                continue
+            positions = np.concatenate([rows for _, rows in selected])
+            values = section.get_plot_values(positions) # ETP is converted from mW to W
+            has_values = ~np.isnan(values).all(axis=1) # Remove rows that have no values but '-'
+            width = decimation_width(values.shape[1], max_trace_points) # Kept in the traces, extend_figure decimates the new columns the same way
+            with PROFILER.stage('decimate', filename, rows=int(has_values.sum()), columns=values.shape[1]):
+                x_values, values, file_decimated = decimate_minmax(time_datapoints, values[has_values], max_trace_points, width)
+            decimated = decimated or file_decimated
+            rmod_ids = np.repeat(np.arange(len(selected)), [len(rows) for _, rows in selected])[has_values]
+            positions = positions[has_values]
+
+            # Loop thru the radios, the metadata index is the row position
+            with PROFILER.stage('traces', filename, rows=len(positions), columns=values.shape[1]):
+                for rmod_id in range(len(selected)):
+                    in_rmod = rmod_ids == rmod_id
+                    if in_rmod.any(): # If the radio has rows left after processes, plot it
+                        traces.extend(self.plot_rmod(df.iloc[positions[in_rmod]], values[in_rmod], x_values[in_rmod], rmod_column_name, second_column_name, name, filename, order_num, width))
+
+        # If there are no traces, none of the dataframes had anything to draw
+        if not traces:
+            return None
+
+        # WebGL draws large figures much faster in the browser, small figures keep the svg traces
+        point_count = sum(len(trace['y']) for trace in traces)
+        trace_type = go.Scattergl if point_count > webgl_points else go.Scatter
+        with PROFILER.stage('make_figure', rows=len(traces), columns=point_count):
+            fig = go.Figure(data=[trace_type(**trace) for trace in traces])
+            self.update_figure_layout(fig, name, filenames_in_order, first_timestamps, max_time_value, max_trace_points if decimated else None)
+        return fig
+
+    def align_files(self, name, filenames, rmod_filter, rmod_to_antenna, step=ALIGN_STEP_S, relative=False):
+        '''
+        align_files: Aligns the section of the already parsed files on a common time grid with align_sections, the rows are
+        filtered like in build_figure
+
+        Returns an AlignedSection, or None if none of the files have rows for the section
+        '''
+        sections = {}
+        positions = {}
+        for filename in filenames:
+            if name not in self.dataframe_dict[filename]:
+                continue
+            selected = [rows for _, rows in self.dataframe_dict[filename][name].select_rows(rmod_filter, rmod_to_antenna)]
+            if selected:
+                sections[filename] = self.dataframe_dict[filename][name]
+                positions[filename] = np.concatenate(selected)
+        with PROFILER.stage('align', section=name) as stage:
+            aligned = align_sections(name, sections, positions, step, relative)
+            if aligned is not None and PROFILER.enabled:
+                stage.set(rows=aligned.values.shape[0] * aligned.values.shape[1], columns=aligned.values.shape[2])
+        return aligned
+
+    def build_aligned_figure(self, aligned, webgl_points=WEBGL_POINTS, max_trace_points=MAX_TRACE_POINTS):
+        '''
+        build_aligned_figure: Builds the plotly figure of an AlignedSection, the x axis is the clock time or the seconds since
+        the first samples when the files were aligned relative. All the files are decimated together in one decimate_minmax call
+
+        param: aligned; AlignedSection, from align_files or its diff
+
+        Returns the figure, or None if the section has no values
+        '''
+        files, rows, steps = aligned.values.shape
+        values = aligned.values.reshape(files * rows, steps)
+        row_ids = np.flatnonzero(~np.isnan(values).all(axis=1)) # Remove rows that have no values in a file
+        if not len(row_ids):
+            return None
+        with PROFILER.stage('figure', section=aligned.name, rows=len(row_ids), columns=steps):
+            x_values, values, decimated = decimate_minmax(aligned.get_time_axis(), values[row_ids], max_trace_points)
+            second_column_name = "Cells" if aligned.name == 'ETP' else "Antenna/Port"
+            traces = []
+            for file_index, filename in enumerate(aligned.filenames):
+                in_file = row_ids // rows == file_index
+                if in_file.any(): # The joined rows of each file, a row has the same color base in every file like in build_figure
+                    traces.extend(self.plot_rmod(aligned.metadata.iloc[row_ids[in_file] % rows], values[in_file], x_values[in_file],
+                                                 "Radio module", second_column_name, aligned.name, filename, file_index + 1))
+            point_count = sum(len(trace['y']) for trace in traces)
+            trace_type = go.Scattergl if point_count > webgl_points else go.Scatter
+            fig = go.Figure(data=[trace_type(**trace) for trace in traces])
+            max_time_value = aligned.grid[-1] if aligned.relative else 0
+            self.update_figure_layout(fig, aligned.name, aligned.filenames, aligned.first_timestamps, max_time_value,
+                                      max_trace_points if decimated else None, clock_time=not aligned.relative)
+            if aligned.reference is not None: # The differences are around zero, the fixed ranges of the section do not fit
+                fig.update_yaxes(range=None, dtick=None)
+                fig.update_layout(title=f'{fig.layout.title.text} minus {aligned.reference}', yaxis_title=f'{PLOT_CONFIG[aligned.name]["yaxis_title"]} difference')
+        return fig
+
+    def extend_figure(self, fig, name, filenames, rmod_filter, rmod_to_antenna, changes, max_trace_points=MAX_TRACE_POINTS, webgl_points=WEBGL_POINTS):
+        '''
+        extend_figure: Appends the new timestamp columns of followed files to the traces of a figure made by build_figure,
+        so a refresh does not build the whole figure again. Decimated traces keep their bucket width, the last unfinished
+        bucket is decimated again together with the new columns and the buckets after it are appended
+
+        param: fig; the figure made by build_figure from the same filenames and filters
+        param: name; string, the section name
+        param: filenames; list of strings, processed filenames in the plotting order
+        param: rmod_filter, rmod_to_antenna; the filters the figure was built with, see build_figure
+        param: changes; dict, filename -> the changes returned by refresh_file
+
+        Returns False if the figure has to be built again instead: a section was parsed from scratch, undecimated traces
+        grew over max_trace_points, decimated traces would get more than max_trace_points with their bucket width,
+        a row without a trace got its first values or the figure grew over webgl_points
+        '''
+        new_columns = {filename: changes.get(filename, {}).get(name, 0) for filename in filenames}
+        if any(count is None for count in new_columns.values()):
+            return False
+
+        file_traces = {} # filename -> the traces of the file, checked before the figure is changed
+        point_count = sum(len(trace.y) for trace in fig.data)
+        for filename, count in new_columns.items():
+            if not count:
+                continue
+            section = self.dataframe_dict[filename][name]
+            traces = [trace for trace in fig.data if trace.meta is not None and trace.meta[0] == filename]
+            columns = len(section.epoch)
+            width = traces[0].meta[2] if traces else decimation_width(columns, max_trace_points)
+            if width == 1 and columns > max_trace_points > 0: # The file has to be decimated from now on
+                return False
+            # A decimated trace has 3 points for each bucket, counting the unfinished last one
+            buckets = -(-columns // width)
+            if width > 1 and 3 * buckets > max_trace_points:
+                return False
+            # build_figure leaves out the rows with only '-', a row which starts reporting needs a new trace
+            selected = [rows for _, rows in section.select_rows(rmod_filter, rmod_to_antenna)]
+            untraced = np.setdiff1d(np.concatenate(selected) if selected else np.empty(0, dtype=np.int64), [trace.meta[1] for trace in traces])
+            if len(untraced) and not np.isnan(section.values[untraced, -count:]).all():
+                return False
+            file_traces[filename] = traces
+            point_count += (count if width == 1 else 3 * (buckets - -(-(columns - count) // width))) * len(traces)
+        if (point_count > webgl_points) != any(isinstance(trace, go.Scattergl) for trace in fig.data):
+            return False
+
+        with fig.batch_update():
+            for filename, traces in file_traces.items():
+                if not traces:
+                    continue
+                count = new_columns[filename]
+                section = self.dataframe_dict[filename][name]
+                width = traces[0].meta[2]
+                # The columns from the start of the last unfinished bucket are decimated again, the points of that bucket are replaced
+                old_columns = len(section.epoch) - count
+                start = old_columns - old_columns % width
+                kept = 3 * (start // width) if width > 1 else old_columns
+                values = section.get_plot_values(np.array([trace.meta[1] for trace in traces]))[:, start:]
+                new_x, new_y, _ = decimate_minmax(section.get_time_axis()[1][start:], values, max_trace_points, width)
+                for trace, x_values, y_values in zip(traces, new_x, new_y):
+                    trace.x = np.concatenate([trace.x[:kept], x_values])
+                    trace.y = np.concatenate([trace.y[:kept], y_values])
+            # The title and the ticks follow the longer capture
+            filenames_in_order = [filename for filename in filenames if name in self.dataframe_dict[filename]]
+            details = [self.get_data_details(self.dataframe_dict[filename][name], name) for filename in filenames_in_order]
+            decimated = any(trace.meta is not None and trace.meta[2] > 1 for trace in fig.data)
+            self.update_figure_layout(fig, name, filenames_in_order, [detail[1] for detail in details], max(detail[0][-1] for detail in details),
+                                      max_trace_points if decimated else None)
+        return True
+
+    def get_data_details(self, section, name): # Gets the time datapoints from the section and sets the second_column_name according to section name
+        if name == 'ETP':
+            second_column_name = "Cells"
+        else:
+            second_column_name = "Antenna/Port"
+
+        # The timestamps are parsed once per section, the seconds are counted from the full datetimes so captures over midnight work too
+        datetimes, timepoints_in_seconds = section.get_time_axis()
+        first_timestamp = pd.Timestamp(datetimes[0]).strftime('%d.%m.%Y %H:%M:%S') # Get the first time datapoint
+        rmod_column_name = "Radio module"
+
+        return timepoints_in_seconds, first_timestamp, rmod_column_name, second_column_name
+
+    def plot_rmod(self, rmod_df, rmod_values, time_datapoints, rmod_column_name, second_column_name, name, filename, color_start_index, width=1):
+        '''
+        plot_rmod: Makes the traces of the rows of one radio, time_datapoints has the x values of each row. The meta of each
+        trace is [filename, row position, width], width is the decimate_minmax bucket the rows were decimated with, 1 for none
+
+        Returns a list of dicts, the keyword arguments of go.Scatter / go.Scattergl for each row
+        '''
+        traces = []
+        band_column_name = 'Supported TX bands' if name == 'VSWR' else 'RX carrier'
+        band_values = rmod_df[band_column_name].astype(str) if band_column_name in rmod_df else [None] * len(rmod_df)
+
+        # Loop thru the rows in the dataframe and the value matrix for the given rmod
+        for idx, rmod_cell, second_row_value, band_value, x_values, y_values in zip(
+                rmod_df.index, rmod_df[rmod_column_name].astype(str), rmod_df[second_column_name].astype(str), band_values, time_datapoints, rmod_values):
+            # Get the rmod_value for creating the legend
+            rmod_value = rmod_cell.split('/')[0]
+
+            # Get the color and line_style
+            color_idx = (idx + color_start_index) % len(PLOT_COLORS)
+            line_style_idx = int(re.findall(r"\d+", second_row_value)[0]) % len(PLOT_LINE_STYLES)
+
+            # Use different legen label formation for different dataframes
+            if name in ['VSWR', 'RTWP', 'RSSI']:
+                label_text = f"{filename} - {rmod_value} - {second_row_value} - {band_value}"
+            else:
+                label_text = f"{filename} - {rmod_value} - {second_row_value}"
+
+            # The datapoints for the given row
+            traces.append(dict(x=x_values, y=y_values, mode='lines', name=label_text,
+                               line=dict(color=PLOT_COLORS[color_idx], dash=PLOT_LINE_STYLES[line_style_idx]),
+                               hovertemplate='%{fullData.name}: %{y}<extra></extra>', meta=[filename, int(idx), int(width)]))
+        return traces
+
+    def update_figure_layout(self, fig, name, filenames_in_order, first_timestamps, max_time_value, decimated_points=None, clock_time=False): # Sets the title, axes and the grid of the figure, clock_time for datetime x values
+        config = PLOT_CONFIG[name]
+
+        # Make the title_prefix for the file
+        title_prefix = ' <span style="color: #FF0000;">|</span> '.join([f"{filename}, {date}" for filename, date in zip(filenames_in_order, first_timestamps)])
+        # Tell in the title if the traces were decimated, the peaks are kept but not every sample is drawn
+        title_suffix = f' (decimated to {decimated_points} points per trace, min/max kept)' if decimated_points else ''
+
+        # Make the major minute ticks, the minor 10 second ticks and the grid lines come from the axis settings
+        if clock_time: # Plotly picks the date ticks for the zoom level
+            xaxis = dict(type='date', ticks='outside', tickwidth=2, ticklen=10, showgrid=True, gridcolor='lightgrey', gridwidth=1.5,
+                         minor=dict(showgrid=True, gridcolor='white', gridwidth=0.5))
+        else:
+            max_time_value = int(max_time_value)
+            major_ticks = list(range(0, max_time_value+1, 60))
+            ticktext = [f'{int(val/60)} min' for val in major_ticks]
+            xaxis = dict(tickvals=major_ticks, ticktext=ticktext, ticks='outside', tickwidth=2, ticklen=10,
+                         showgrid=True, gridcolor='lightgrey', gridwidth=1.5,
+                         minor=dict(tickmode='linear', tick0=0, dtick=10, showgrid=True, gridcolor='white', gridwidth=0.5))
+        yaxis = dict(range=config.get('yaxis_range'), dtick=config.get('yaxis_dtick'))
+        if name in ["RTWP", "RSSI"]:
+            yaxis.update(showgrid=True, gridcolor='lightgrey', gridwidth=1.5,
+                         minor=dict(tickmode='linear', dtick=1, showgrid=True, gridcolor='white', gridwidth=0.5))
+
+        # Update figure layout according to the dataframe
+        fig.update_layout(
+            title=f'{title_prefix} {config["title"]}{title_suffix}',
+            xaxis_title='Time' if clock_time else 'Time (minutes)',
+            yaxis_title=config['yaxis_title'],
+            yaxis=yaxis, xaxis=xaxis, showlegend=True
+        )
+
+def read_sections_worker(dataframe_names, filename_path, names): # Reads the sections of one export in a worker process of open_files
+    return AntennaLineParser(dataframe_names, converted_dir=None).read_sections(filename_path, names)
+
+def run_file_jobs(function, jobs, workers):
+    '''
+    run_file_jobs: Runs function once for each job, in a process pool when workers is above 1. The profiler records the
+    stages of this process only, so the jobs are run one by one while profiling
+
+    param: function; a module level function, called as function(*job)
+    param: jobs; list of tuples, the arguments of each call
+    param: workers; int, the maximum number of worker processes
+
+    Yields for each job in order a function which returns the result of the call or raises its error, so a failure in one
+    file does not stop the others
+    '''
+    if workers > 1 and len(jobs) > 1 and not PROFILER.enabled:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [executor.submit(function, *job) for job in jobs]
+            for future in futures:
+                yield future.result
+    else:
+        for job in jobs:
+            yield lambda job=job: function(*job)
+
+def prepare_batch(input_paths, output_dir, rmod_input, antenna_input): # Parses the filters, creates output_dir and expands the input paths, returns (file_paths, rmod_filter, rmod_to_antenna)
+    rmod_filter, antenna_filter_list = parse_filter_strings(rmod_input, antenna_input)
+    os.makedirs(output_dir, exist_ok=True)
+    return expand_input_paths(input_paths), rmod_filter, dict(zip(rmod_filter, antenna_filter_list))
+
+def import_tk(): # Imports tkinter for the GUI when it is started, headless servers may not have Tk installed and the other modes do not need it
+    global tk, filedialog, messagebox
+    import tkinter as tk
+    import tkinter.filedialog as filedialog
+    from tkinter import messagebox
+
+class DataReader(AntennaLineParser):
+    def __init__(self,dataframe_names, workers=LOAD_WORKERS, profile_path=PROFILE_PATH):
+        super().__init__(dataframe_names)
         self.selected_files = []
+        self.workers = workers
+        self.follow = None # State of the live view, see start_follow
+        self.profile_path = profile_path or os.path.join(tempfile.gettempdir(), 'antenna_line_profile.json')
         self.init_gui()
 
     def init_gui(self): # Initializes all the tkinter GUI elements
+        import_tk()
         self.root = tk.Tk()
         self.root.title("Antennaline data visualizer")
 
@@ -55,7 +1372,7 @@ class DataReader:
 
         self.select_files_button = tk.Button(self.root, text="Select Files", command=self.select_files)
         self.select_files_button.pack()
-        
+
         self.rmod_label = tk.Label(self.root, text="Enter radios (e.g., '1,4,5' or leave blank for all):")
         self.rmod_label.pack()
         self.rmod_input = tk.Entry(self.root)
@@ -70,33 +1387,38 @@ class DataReader:
 
         self.vswr_button = tk.Button(self.root, text="VSWR", command=lambda: self.plot_data('VSWR'))
         self.vswr_button.pack()
-        
+
         self.rtwp_button = tk.Button(self.root, text="RTWP", command=lambda: self.plot_data('RTWP'))
         self.rtwp_button.pack()
-        
+
         self.rssi_button = tk.Button(self.root, text="RSSI", command=lambda: self.plot_data('RSSI'))
         self.rssi_button.pack()
-        
+
         self.etp_button = tk.Button(self.root, text="ETP", command=lambda: self.plot_data('ETP'))
         self.etp_button.pack()
 
+        self.follow_var = tk.BooleanVar(value=False)
+        self.follow_check = tk.Checkbutton(self.root, text="Follow the files (live view of exports which are still growing)", variable=self.follow_var)
+        self.follow_check.pack()
+
+        self.align_var = tk.BooleanVar(value=False)
+        self.align_check = tk.Checkbutton(self.root, text=f"Align the files on the clock time ({ALIGN_STEP_S} s steps) instead of their first samples", variable=self.align_var)
+        self.align_check.pack()
+
+        self.profile_var = tk.BooleanVar(value=PROFILER.enabled)
+        self.profile_check = tk.Checkbutton(self.root, text=f"Profile the loading and plotting (stage times into {self.profile_path})",
+                                            variable=self.profile_var, command=self.toggle_profiling)
+        self.profile_check.pack()
+
+        # Buttons which are disabled while the files are being loaded
+        self.busy_buttons = [self.select_files_button, self.vswr_button, self.rtwp_button, self.rssi_button, self.etp_button]
+
 
         self.root.mainloop()
-        
-    def open_file(self, filename_path, filename):
+
+    def open_file(self, filename_path, filename, names=None):
         try:
-            # Skipping the first row of the data
-            if filename_path.endswith(".csv"):
-                df = pd.read_csv(filename_path, skiprows=1, sep=SEPARATOR)
-            elif filename_path.endswith(".xlsx"):
-                df = pd.read_excel(filename_path, engine='openpyxl', skiprows=1)
-
-            df_split_index_dict = {}
-            for value in DATAFRAMES:
-                self.find_df_split_index(df, value, df_split_index_dict)
-            self.split_dataframes(df, df_split_index_dict, filename)
-
-            return True
+            return super().open_file(filename_path, filename, names)
         except Exception as e:
             ext = '.xlsx' if filename_path.endswith('.xlsx') else '.csv'
             if ext == '.csv':
@@ -105,38 +1427,11 @@ class DataReader:
                 messagebox.showerror("Error", f"An error occurred while opening the file: {filename+ext}\n{e}\n")
             print(f"An error occurred while opening the file: {e}")
             return False
-        
-    def find_df_split_index(self, df, name, dict): # Finds the indexes, in order to split the csv into separate dataframes
-        if name == 'VSWR':
-            dict[name] = 0
-        else:
-            dict[name] = df[df['Radio module'].str.contains(name, case=False, na=False)].index[0]
-
-    def split_dataframes(self, df, split_dict, filename): # Splits the dataframes 
-        key_index = 0
-        self.dataframe_dict[filename] = {} # A new datastrure for storing dataframes insidea dict under a certain filename
-        for key in self.dataframe_names:
-            if key_index == 0:
-                new_dataframe = df.loc[:split_dict[self.dataframe_names[key_index + 1]] - 1, :] # Split the first dataframe 
-            elif key_index == len(self.dataframe_names) - 1:
-                new_dataframe = df.loc[split_dict[self.dataframe_names[key_index]] + 1:, :] # Split the last dataframe
-            else:
-                new_dataframe = df.loc[split_dict[self.dataframe_names[key_index]] + 1:split_dict[self.dataframe_names[key_index + 1]] - 1, :] # Split the middle datafrmames
 
-            if new_dataframe.applymap(lambda x: 'No data available' in str(x)).any().any(): # If the dataframe has this, it is empty
-                continue
-            elif key_index != 0: # If not the first dataframe, adjust the first row of the dataframe to be the header row and reset index
-                new_dataframe.columns = new_dataframe.iloc[0]
-                new_dataframe = new_dataframe[1:]
-                new_dataframe = new_dataframe.reset_index(drop=True)
-
-            self.dataframe_dict[filename][key] = new_dataframe # Store the dataframe
-            key_index += 1
-    
     def select_files(self):
         input = self.num_files_input.get() # Get the number of files input
         if not all(c.isdigit() for c in input):
-            messagebox.showerror("Error", "The number of files input field contains something else than numbers!") 
+            messagebox.showerror("Error", "The number of files input field contains something else than numbers!")
             return
         elif input == "":
             num_files = 1
@@ -150,27 +1445,19 @@ class DataReader:
         self.selected_files = [] # Clear previously selected files if any
         for _ in range(num_files):
             filename = filedialog.askopenfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv"), ("Excel Files", "*.xlsx")])
+            if not filename: # The dialog was cancelled
+                continue
             if filename.endswith(".csv"):
-                with open(filename, 'r') as file:
+                with open(filename, 'r', encoding='utf-8-sig') as file:
                     first_line = file.readline().strip()
                     # If the values VSWR not in the first line, then the file is invalid
                     if "VSWR" not in first_line:
                         messagebox.showerror("Error", "The selected file is invalid, file skipped!")
                         continue
-                    else:
-                        messagebox.showinfo("Success", "File accepted")
-            elif filename.endswith(".xlsx"):
-                try:
-                    df = pd.read_excel(filename, engine='openpyxl', nrows=1)  # Read only the first row to check
-                    # If the values VSWR not in the first column, then the file is invalid
-                    if "VSWR" not in df.columns:
-                        messagebox.showerror("Error", "The selected file is invalid, file skipped!")
-                        continue
-                    else:
-                        messagebox.showinfo("Success", "File accepted")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Error reading the file: {e}")
-                    continue
+            # Parse the file already here, the file is invalid if the sections cannot be found. The parsed sections are cached and reused when plotting
+            if not self.open_file(filename, self.process_filename(self.extract_filename(filename)), [self.dataframe_names[0]]):
+                continue
+            messagebox.showinfo("Success", "File accepted")
             self.selected_files.append(filename)
         self.num_files_input.delete(0, tk.END) # Empty the input field
 
@@ -179,230 +1466,427 @@ class DataReader:
             messagebox.showerror("Error", "No files selected")
             return
 
-        filenames = [self.extract_filename(file) for file in self.selected_files]
-
-        for filename_path in self.selected_files: # Iterate over selected file paths
-            filename = self.process_filename(self.extract_filename(filename_path)) # Split the filename from the path
-            if self.open_file(filename_path, filename): # Open the file and store dataframes
-                pass
-            else:
-                print(f"An error occured while opening/reading the file {filename}")
-                return
-            
         # Read the input fields
         rmod_filter, antenna_filter_list = self.parse_filter_inputs()
         rmod_to_antenna = dict(zip(rmod_filter, antenna_filter_list))
 
-        fig = go.Figure() # Creates the new graph figure
-        first_timestamps = []
-        filenames_in_order = []
-        max_time_value = 0
-        dataframes_empty = True
+        self.stop_follow() # A new plot replaces the live view
+        PROFILER.clear() # The profile covers the latest plot
+        # The files are loaded in a background thread, so the window stays responsive. Only the plotted section is read
+        self.dataframe_dict = {} # Only the selected files are plotted, the parsed sections stay in the cache
+        selected_files = list(self.selected_files)
+        labels = self.file_labels(selected_files) # test.csv and test.xlsx must not replace each other
+        result = {}
+        def load_files():
+            try:
+                result['errors'] = self.open_files(selected_files, [name], self.workers, labels)
+            except Exception as e:
+                result['errors'] = {path: e for path in selected_files}
+        thread = threading.Thread(target=load_files, daemon=True)
+        self.set_busy(True)
+        thread.start()
+        self.root.after(LOAD_POLL_MS, self.finish_plot, thread, result, name, selected_files, labels, rmod_filter, rmod_to_antenna)
 
-        for order_num, filename in enumerate(filenames, 1): # Loop thru the filenames
-            processed_filename = self.process_filename(filename)
-            if name not in self.dataframe_dict[processed_filename]: # Check that the dataframe by the name exists
-                continue
+    def finish_plot(self, thread, result, name, selected_files, labels, rmod_filter, rmod_to_antenna): # Plots the files when the background loading has finished
+        if thread.is_alive():
+            self.root.after(LOAD_POLL_MS, self.finish_plot, thread, result, name, selected_files, labels, rmod_filter, rmod_to_antenna)
+            return
+        self.set_busy(False)
 
-            # Get the dataframe by the given name from the dict
-            df = self.dataframe_dict[processed_filename][name]
-            # Drops the na values form the dataframe
-            df = df.dropna(axis=1, how='all')
+        errors = result.get('errors', {})
+        for filename_path, e in errors.items(): # Report the failed files, the others are plotted
+            print(f"An error occured while opening/reading the file {filename_path}: {e}")
+            messagebox.showerror("Error", f"An error occurred while opening the file: {os.path.basename(filename_path)}\n{e}\n")
+        filenames = [labels[filename_path] for filename_path in selected_files if filename_path not in errors]
+        if not filenames:
+            return
 
-            filenames_in_order.append(processed_filename)
-            # Get details from the dataframe
-            time_datapoints, first_timestamp, rmod_column_name, second_column_name = self.get_data_details(df, name)
-            first_timestamps.append(first_timestamp)
+        align = self.align_var.get()
+        fig = self.make_plot_figure(name, filenames, rmod_filter, rmod_to_antenna, align)
 
-            if max_time_value < max(max_time_value, time_datapoints[-1]): # Keep track of the max_time_value across the dataframes in different files
-                    max_time_value = max(max_time_value, time_datapoints[-1])
+        # If a figure was returned, then show it, else, do not show because no dataframes were drawn into the figure
+        if fig is None:
+            messagebox.showerror("Error", "The selected file(s) do not contain this datafield")
+        elif self.follow_var.get():
+            self.start_follow(name, [path for path in selected_files if path not in errors], filenames, rmod_filter, rmod_to_antenna, fig, align)
+        else:
+            with PROFILER.stage('show', section=name):
+                fig.show()
+        if self.profile_var.get():
+            self.write_profile()
 
-            # Filter the rmods 
-            if rmod_filter:
-                df = self.filter_dataframe(df, rmod_filter, rmod_column_name)
-            
-            # Loop thru the unique rmods after the filteration
-            for rmod in df[rmod_column_name].unique():
-                rmod_df = df[df[rmod_column_name] == rmod]
-
-                if name != 'ETP':
-                    antenna_filter = self.get_antenna_filter_for_rmod(rmod, rmod_to_antenna) # Filter the antennas for the given rmod
-                    if antenna_filter:
-                        rmod_df = rmod_df[rmod_df[second_column_name].apply(lambda x: any(antenna in x for antenna in antenna_filter))]
-                    else:
-                        pass
-                        #print(f"Graphing all antennas for {rmod}")
-
-                rmod_df = rmod_df[~rmod_df.iloc[:, 3:].applymap(lambda x: x == '-').all(axis=1)] # Remove rows that have no values but '-'
-
-                if not rmod_df.empty: # If rmod dataframe is not empty after processes, plot it
-                    dataframes_empty = False
-                    filename = self.process_filename(filename)
-                    self.plot_rmod(rmod_df, time_datapoints, rmod_column_name, second_column_name, name, fig, first_timestamps, filename, filenames_in_order, order_num, max_time_value)
-
-        # If variable dataframes_empty was False, then show the figure, else, do not show because no dataframes were drawn into the figure
-        if not dataframes_empty:
-            fig.show()
+    def make_plot_figure(self, name, filenames, rmod_filter, rmod_to_antenna, align=False): # Builds the figure of the plot buttons, align puts the files on the clock time
+        if not align:
+            return self.build_figure(name, filenames, rmod_filter, rmod_to_antenna)
+        aligned = self.align_files(name, filenames, rmod_filter, rmod_to_antenna)
+        return None if aligned is None else self.build_aligned_figure(aligned)
+
+    def start_follow(self, name, filename_paths, filenames, rmod_filter, rmod_to_antenna, fig, align=False):
+        '''
+        start_follow: Shows the figure as a live view. The files are checked every FOLLOW_INTERVAL_S seconds, only the new
+        timestamp columns are read and appended to the traces, and the page in the browser reloads itself
+        '''
+        html_path = os.path.join(tempfile.gettempdir(), f"antenna_line_live_{name}.html")
+        for filename_path, filename in zip(filename_paths, filenames):
+            self.follow_file(filename_path, filename)
+        self.follow = dict(name=name, filename_paths=filename_paths, filenames=filenames, rmod_filter=rmod_filter,
+                           rmod_to_antenna=rmod_to_antenna, fig=fig, align=align, html_path=html_path, after_id=None)
+        write_live_html(fig, html_path, FOLLOW_INTERVAL_S)
+        webbrowser.open('file://' + html_path)
+        self.schedule_follow(self.follow)
+
+    def stop_follow(self):
+        if self.follow is not None and self.follow['after_id'] is not None:
+            self.root.after_cancel(self.follow['after_id'])
+        self.follow = None
+
+    def schedule_follow(self, follow):
+        follow['after_id'] = self.root.after(FOLLOW_INTERVAL_S * 1000, self.refresh_follow, follow)
+
+    def refresh_follow(self, follow): # Reads the changed files in a background thread, the results are stored in finish_follow
+        results = {}
+        def read_files():
+            for filename_path in follow['filename_paths']:
+                try:
+                    results[filename_path] = self.read_followed(filename_path, [follow['name']])
+                except Exception as e: # The file may be in the middle of being written, try again on the next round
+                    print(f"Could not refresh the file {filename_path}: {e}", file=sys.stderr)
+        thread = threading.Thread(target=read_files, daemon=True)
+        thread.start()
+        follow['after_id'] = self.root.after(LOAD_POLL_MS, self.finish_follow, follow, thread, results)
+
+    def finish_follow(self, follow, thread, results):
+        if thread.is_alive():
+            follow['after_id'] = self.root.after(LOAD_POLL_MS, self.finish_follow, follow, thread, results)
+            return
+        if follow is not self.follow: # The live view was replaced while the files were read
+            return
+        changes = {filename: self.store_followed(filename_path, filename, results.get(filename_path))
+                   for filename_path, filename in zip(follow['filename_paths'], follow['filenames'])}
+        if any(changes.values()):
+            # The aligned figure is built again, its grid may grow at the start as well as at the end
+            if follow['align'] or not self.extend_figure(follow['fig'], follow['name'], follow['filenames'], follow['rmod_filter'], follow['rmod_to_antenna'], changes):
+                follow['fig'] = self.make_plot_figure(follow['name'], follow['filenames'], follow['rmod_filter'], follow['rmod_to_antenna'], follow['align']) or follow['fig']
+            write_live_html(follow['fig'], follow['html_path'], FOLLOW_INTERVAL_S)
+        self.schedule_follow(follow)
+
+    def toggle_profiling(self):
+        if self.profile_var.get():
+            PROFILER.enable()
         else:
-            messagebox.showerror("Error", "The selected file(s) do not contain this datafield")
+            PROFILER.disable()
 
-    def extract_filename(self, file_path): # Extracts the filename from the path from the file
-        return file_path.split('/')[-1].split('.')[0]
+    def write_profile(self): # Writes the stages of the latest plot into the profile file and prints them into the console
+        try:
+            PROFILER.write_json(self.profile_path)
+        except OSError as e:
+            print(f"Could not write the profile {self.profile_path}: {e}", file=sys.stderr)
+        print(PROFILER.report(), file=sys.stderr)
 
-    def parse_filter_inputs(self): # Reads and parses the radio and antenna input fields
-        rmod_input = self.rmod_input.get().replace(' ', '')
-        antenna_input = self.antenna_input.get().replace(' ', '')
+    def set_busy(self, busy): # Disables the buttons while the files are being loaded
+        for button in self.busy_buttons:
+            button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.root.config(cursor='watch' if busy else '')
 
-        if not all(c.isdigit() or c in [',', ';'] for c in rmod_input) or not all(c.isdigit() or c in [',', ';'] for c in antenna_input):
-            messagebox.showerror("Error", f"Invalid input!\n The input field(s) contain something else than numbers, commas or semicolons")
+    def parse_filter_inputs(self): # Reads and parses the radio and antenna input fields
+        try:
+            return parse_filter_strings(self.rmod_input.get(), self.antenna_input.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid input!\n {e}")
             return [], []
-        
-        # Parse the rmod and antenna filteration data from the input fields
-        rmod_filter = ["RMOD-" + item.strip() + "/" for item in rmod_input.split(',') if item.strip()]
-        antenna_filter_parts = [part for part in antenna_input.split(';') if part]
-        antenna_filter_list = [part.split(',') for part in antenna_filter_parts]
 
-        return rmod_filter, antenna_filter_list
+def write_live_html(fig, path, refresh_seconds, include_plotlyjs='cdn'): # Writes the figure as a html page which reloads itself, the file is replaced atomically
+    temporary_path = path + '.tmp'
+    with PROFILER.stage('write_html', path):
+        fig.write_html(temporary_path, include_plotlyjs=include_plotlyjs,
+                       post_script=f"setTimeout(function() {{ window.location.reload(); }}, {int(refresh_seconds * 1000)});")
+    os.replace(temporary_path, path)
 
-    def process_filename(self, filename): # If the filename is the original, which WebEM returns, extract BTS id and time from it
-        if "ANTL" in filename:
-            partial_filename = filename[15:]
-            return partial_filename[:partial_filename.find("_")] + ":" + partial_filename[-4:]
-        return filename
+def run_batch(input_paths, output_dir, names, rmod_input='', antenna_input='', include_plotlyjs='cdn', converted_dir=CONVERTED_DIR, workers=LOAD_WORKERS):
+    '''
+    run_batch: Parses the given exports without the GUI and writes the parsed sections as csv files and the plots as html files into output_dir
 
-    def get_data_details(self, df, name): # Gets the time datapoints from the dataframe and sets the second_column_name according to dataframe name
-        if name == 'ETP':
-            columns_start = 2
-            second_column_name = "Cells"
-        else:
-            columns_start = 3
-            second_column_name = "Antenna/Port"
+    param: input_paths; list of strings, paths to exports or directories containing exports
+    param: output_dir; string, the directory for the output files, created if missing
+    param: names; list of strings, the sections to be written e.g. ['VSWR', 'RTWP']
+    param: rmod_input; string, radio filter in the same format as in the GUI
+    param: antenna_input; string, antenna filter in the same format as in the GUI
+    param: include_plotlyjs; passed to plotly write_html, 'cdn' keeps the html files small
+    param: converted_dir; string, directory for the converted binary bundles of the exports, None to disable
+    param: workers; int, the number of files processed concurrently in worker processes
 
-        time_datapoints = df.columns[columns_start:].tolist() # Make the time datapoints from the header row into a list
-        first_timestamp = pd.to_datetime(df.columns[columns_start], format=infer_datetime_format(df.columns[columns_start])).strftime('%d.%m.%Y %H:%M:%S') # Get the first time datapoint
-        rmod_column_name = "Radio module"
-        formatted_timepoints = pd.Series(pd.to_datetime(time_datapoints, format=infer_datetime_format(df.columns[columns_start]))).dt.strftime('%H:%M:%S').tolist() 
-        first_time_point = pd.to_datetime(formatted_timepoints[0], format='%H:%M:%S')
-        timepoints_in_seconds = [(pd.to_datetime(time, format='%H:%M:%S') - first_time_point).total_seconds() for time in formatted_timepoints]
+    Returns the list of (path, error) tuples for the files that failed
+    '''
+    file_paths, rmod_filter, rmod_to_antenna = prepare_batch(input_paths, output_dir, rmod_input, antenna_input)
+    base_names = output_base_names(file_paths)
+    arguments = (output_dir, names, rmod_filter, rmod_to_antenna, include_plotlyjs, converted_dir)
+    jobs = [(filename_path, base_names[filename_path]) + arguments for filename_path in file_paths]
+    failed = []
+    for filename_path, result in zip(file_paths, run_file_jobs(process_batch_file, jobs, workers)):
+        try:
+            result()
+            print(f"Processed {filename_path}")
+        except Exception as e:
+            print(f"An error occurred while processing the file {filename_path}: {e}", file=sys.stderr)
+            failed.append((filename_path, e))
+    return failed
 
-        return timepoints_in_seconds, first_timestamp, rmod_column_name, second_column_name
+def process_batch_file(filename_path, base_name, output_dir, names, rmod_filter, rmod_to_antenna, include_plotlyjs, converted_dir): # Writes the outputs of one export in run_batch, see output_base_names
+    parser = AntennaLineParser(DATAFRAMES, converted_dir=converted_dir) # One parser per file, so the parsed data of the earlier files is released
+    with PROFILER.stage('file', filename_path):
+        sections = parser.parse_file(filename_path, names)
+        filename = parser.process_filename(parser.extract_filename(filename_path))
+        for name in names:
+            if name not in sections:
+                continue
+            with PROFILER.stage('write_csv', section=name, rows=sections[name].values.shape[0], columns=sections[name].values.shape[1]):
+                sections[name].to_dataframe().to_csv(os.path.join(output_dir, f"{base_name}_{name}.csv"), index=False)
+            fig = parser.build_figure(name, [filename], rmod_filter, rmod_to_antenna)
+            if fig is not None:
+                with PROFILER.stage('write_html', section=name):
+                    fig.write_html(os.path.join(output_dir, f"{base_name}_{name}.html"), include_plotlyjs=include_plotlyjs)
 
-    def filter_dataframe(self, df, rmod_filter, rmod_column_name):
-        return df[df[rmod_column_name].astype(str).apply(lambda x: any(rmod in x for rmod in rmod_filter))]
-    
-    def get_antenna_filter_for_rmod(self, rmod, mapping_dict): # Returns the antenna filter list for a given rmod
-        for key in mapping_dict:
-            if key in rmod:
-                return mapping_dict[key]
-        return None
+def run_analysis(input_paths, output_dir, names, limits=None, rmod_input='', antenna_input='', converted_dir=CONVERTED_DIR, workers=LOAD_WORKERS):
+    '''
+    run_analysis: Screens the given exports without plotting. The statistics of every row of the sections are collected into
+    one report, which is written as REPORT_FILENAME into output_dir, and the rows outside the limits are flagged
 
-    def plot_rmod(self, rmod_df, time_datapoints, rmod_column_name, second_column_name, name, fig, first_timestamps, filename, filenames_in_order, color_start_index, max_time_value):
-        colors = ['red', 'blue', 'green', 'purple', 'orange', 'pink', 'brown', 'gray', 'navy','darkgreen', 'maroon', 'darkorange', 'indigo', 'chocolate', 'deeppink', 'dimgray']
-        line_styles = ['longdash', 'longdashdot', 'dot', 'dash', 'solid', 'dashdot']
-        
-        # Make configuration for each name value inside a config dictionary
-        config = {
-            'VSWR': {'title': 'VSWR by Time', 'yaxis_title': 'VSWR'},
-            'RTWP': {'title': 'RTWP by Time', 'yaxis_title': 'RTWP (dBm)', 'yaxis_range': [-110, -50], 'yaxis_dtick': 5},
-            'RSSI': {'title': 'RSSI by Time', 'yaxis_title': 'RSSI (dBm)', 'yaxis_range': [-110, 5], 'yaxis_dtick': 5},
-            'ETP': {'title': 'ETP by Time', 'yaxis_title': 'ETP (W)', 'yaxis_range': [0, 30], 'yaxis_dtick': 1},
-        }
-
-        # Method for creating the graph lines for the ticks
-        def create_grid_for_ticks(major_ticks, minor_ticks, orientation='vertical'):
-            if orientation == 'vertical':
-                y0, y1, xref, yref = 0, 1, None, 'paper'
-            else:  # orientation is horizontal
-                x0, x1, xref, yref = 0, 1, 'paper', None
-                
-            major_shapes = [{
-                'type': 'line', 
-                'x0': tick if orientation == 'vertical' else x0,
-                'x1': tick if orientation == 'vertical' else x1,
-                'y0': tick if orientation == 'horizontal' else y0,
-                'y1': tick if orientation == 'horizontal' else y1,
-                'xref': xref,
-                'yref': yref,
-                'line': {'color': 'lightgrey', 'width': 1.5},
-            } for tick in major_ticks]
-            
-            minor_shapes = [{
-                'type': 'line',
-                'x0': tick if orientation == 'vertical' else x0,
-                'x1': tick if orientation == 'vertical' else x1,
-                'y0': tick if orientation == 'horizontal' else y0,
-                'y1': tick if orientation == 'horizontal' else y1,
-                'xref': xref,
-                'yref': yref,
-                'line': {'color': 'white', 'width': 0.5},
-            } for tick in minor_ticks]
-            
-            return major_shapes + minor_shapes
-
-
-        # Loop thru the rows in the dataframe for the given rmod
-        for idx, row in rmod_df.iterrows():
-            # Get the rmod_value and second_row_value for creating the legend
-            rmod_value = row[rmod_column_name].split('/')[0]
-            second_row_value = row[second_column_name]
+    param: input_paths; list of strings, paths to exports or directories containing exports
+    param: output_dir; string, the directory for the report, created if missing
+    param: names; list of strings, the sections to analyze e.g. ['VSWR', 'RTWP']
+    param: limits; dict, the limits by the section name, see ANALYSIS_LIMITS and parse_limit_strings
+    param: rmod_input; string, radio filter in the same format as in the GUI
+    param: antenna_input; string, antenna filter in the same format as in the GUI
+    param: converted_dir; string, directory for the converted binary bundles of the exports, None to disable
+    param: workers; int, the number of files analyzed concurrently in worker processes
 
-            # Get the color and line_style
-            color_idx = (idx + color_start_index) % len(colors)
-            line_style_idx = int(re.findall("\d+", second_row_value)[0]) % len(line_styles)
+    Returns the report dataframe and the list of (path, error) tuples for the files that failed
+    '''
+    limits = ANALYSIS_LIMITS if limits is None else limits
+    file_paths, rmod_filter, rmod_to_antenna = prepare_batch(input_paths, output_dir, rmod_input, antenna_input)
+    arguments = (names, limits, rmod_filter, rmod_to_antenna, converted_dir)
+    reports = []
+    failed = []
+    for filename_path, result in zip(file_paths, run_file_jobs(analyze_file, [(filename_path,) + arguments for filename_path in file_paths], workers)):
+        try:
+            reports.append(result())
+        except Exception as e:
+            print(f"An error occurred while analyzing the file {filename_path}: {e}", file=sys.stderr)
+            failed.append((filename_path, e))
 
-            # Use different legen label formation for different dataframes
-            if name in ['VSWR', 'RTWP', 'RSSI']:
-                band_value = row.get('Supported TX bands') if name == 'VSWR' else row['RX carrier']
-                # Convert y_values for to numbers if they are not already, also convert '-' values to nan values
-                y_values = [float(value.replace(',', '.')) if isinstance(value, str) and value != '-' else value if value != '-' else np.nan for value in row.values[3:]]
-                label_text = f"{filename} - {rmod_value} - {second_row_value} - {band_value}"
-            else:
-                # Convert mW values to W and to numbers and convert '-' values to nan values
-                y_values = [float(value)/1000 if value != '-' else np.nan for value in row.values[2:]]
-                label_text = f"{filename} - {rmod_value} - {second_row_value}"
-            
-            
-            # Draw the datapoints for the given row
-            fig.add_trace(go.Scatter(x=time_datapoints, y=y_values, mode='lines', name=label_text,
-                                    line=dict(color=colors[color_idx], dash=line_styles[line_style_idx]),
-                                    hovertemplate='%{fullData.name}: %{y}<extra></extra>'))
+    report = concat_reports(reports)
+    report.to_csv(os.path.join(output_dir, REPORT_FILENAME), index=False)
+    return report, failed
 
-        # Make the title_prefix for the file
-        title_prefix = ' <span style="color: #FF0000;">|</span> '.join([f"{filename}, {date}" for filename, date in zip(filenames_in_order, first_timestamps)])
-        
-        # Make the major minute ticks and minor 10 second ticks
-        max_time_value = int(max_time_value)
-        major_ticks = list(range(0, max_time_value+1, 60))
-        minor_ticks = list(range(0, max_time_value+1, 10))
-        all_ticks = sorted(set(major_ticks))
-        ticktext = [f'{int(val/60)} min' if val in major_ticks else '' for val in all_ticks]
+def analyze_file(filename_path, names, limits, rmod_filter, rmod_to_antenna, converted_dir): # Returns the report rows of one export in run_analysis
+    parser = AntennaLineParser(DATAFRAMES, converted_dir=converted_dir)
+    with PROFILER.stage('file', filename_path):
+        sections = parser.parse_file(filename_path, names)
+    reports = []
+    for name in names:
+        if name not in sections:
+            continue
+        section = sections[name]
+        positions = [rows for _, rows in section.select_rows(rmod_filter, rmod_to_antenna)]
+        if not positions:
+            continue
+        positions = np.concatenate(positions)
+        with PROFILER.stage('analysis', filename_path, name, rows=len(positions), columns=section.values.shape[1]):
+            report = section_statistics(section, limits.get(name), positions)
+        report.insert(0, 'section', name)
+        report.insert(0, 'file', filename_path) # The path as given, exports with the same name in different directories stay apart
+        reports.append(report)
+    return concat_reports(reports)
 
-        if name in ["RTWP", "RSSI"]:
-            y_major_ticks = list(range(config[name]['yaxis_range'][0], config[name]['yaxis_range'][1] + 1, 5))
-            y_minor_ticks = list(range(config[name]['yaxis_range'][0], config[name]['yaxis_range'][1] + 1, 1))
-            y_grid_shapes = create_grid_for_ticks(y_major_ticks, y_minor_ticks, orientation='horizontal')
-        else:
-            y_grid_shapes = []
+def concat_reports(reports): # Concatenates the reports, the metadata columns differ between the sections so all of them are kept before the statistics
+    reports = [part for part in reports if 'samples' in part]
+    if not reports:
+        return pd.DataFrame(columns=['file', 'section'])
+    metadata_columns = [column for part in reports for column in part.columns[:part.columns.get_loc('samples')]]
+    statistics_columns = [column for part in reports for column in part.columns[part.columns.get_loc('samples'):] if column != 'flagged']
+    return pd.concat(reports, ignore_index=True)[list(dict.fromkeys(metadata_columns + statistics_columns)) + ['flagged']]
 
-        # Create grid shapes in line with the tickmarks on the x axis
-        x_grid_shapes = create_grid_for_ticks(major_ticks, minor_ticks)
-        # Combine the x and y axis shapes
-        grid_shapes = x_grid_shapes + y_grid_shapes
+def run_alignment(input_paths, output_dir, names, step=ALIGN_STEP_S, relative=False, diff=False, rmod_input='', antenna_input='',
+                  include_plotlyjs='cdn', converted_dir=CONVERTED_DIR, workers=LOAD_WORKERS):
+    '''
+    run_alignment: Aligns the given exports on a common time grid and writes for each section one csv file of the aligned
+    values of all the files (aligned_<section>.csv) and one html plot of them (aligned_<section>.html) into output_dir
 
+    param: input_paths; list of strings, paths to exports or directories containing exports, in the order of the files
+    param: output_dir; string, the directory for the output files, created if missing
+    param: names; list of strings, the sections to align e.g. ['VSWR', 'RTWP']
+    param: step; int, the grid step in seconds
+    param: relative; boolean, align the files on their first samples instead of the clock time
+    param: diff; boolean, write the differences of the other files to the first file instead of the values
+    param: rmod_input; string, radio filter in the same format as in the GUI
+    param: antenna_input; string, antenna filter in the same format as in the GUI
+    param: include_plotlyjs; passed to plotly write_html
+    param: converted_dir; string, directory for the converted binary bundles of the exports, None to disable
+    param: workers; int, the number of files loaded concurrently in worker processes
 
-        # Update figure layout according to the dataframe
-        fig.update_layout(
-            title=f'{title_prefix} {config[name]["title"]}',
-            xaxis_title='Time (minutes)',
-            yaxis_title=config[name]['yaxis_title'],
-            yaxis=dict(range=config[name].get('yaxis_range'), dtick=config[name].get('yaxis_dtick')),
-            xaxis=dict(tickvals=all_ticks, ticktext=ticktext, ticks='outside', tickwidth=2, ticklen=10, showgrid=False),
-            shapes=grid_shapes, showlegend=True
-        )
-                    
+    Returns the list of (path, error) tuples for the files that failed
+    '''
+    file_paths, rmod_filter, rmod_to_antenna = prepare_batch(input_paths, output_dir, rmod_input, antenna_input)
+    parser = AntennaLineParser(DATAFRAMES, converted_dir=converted_dir)
+    labels = parser.file_labels(file_paths) # Each file is kept apart even if the processed filenames are the same
+    errors = parser.open_files(file_paths, names, workers, labels)
+    for filename_path, e in errors.items():
+        print(f"An error occurred while opening the file {filename_path}: {e}", file=sys.stderr)
+    filenames = list(dict.fromkeys(labels[path] for path in file_paths if path not in errors))
+    for name in names:
+        aligned = parser.align_files(name, filenames, rmod_filter, rmod_to_antenna, step, relative)
+        if aligned is None:
+            continue
+        if diff:
+            if len(aligned.filenames) < 2:
+                print(f"{name}: only one file has data, nothing to compare", file=sys.stderr)
+                continue
+            aligned = aligned.diff()
+        with PROFILER.stage('write_csv', section=name):
+            aligned.to_dataframe().to_csv(os.path.join(output_dir, f"aligned_{name}.csv"), index=False)
+        fig = parser.build_aligned_figure(aligned)
+        if fig is not None:
+            with PROFILER.stage('write_html', section=name):
+                fig.write_html(os.path.join(output_dir, f"aligned_{name}.html"), include_plotlyjs=include_plotlyjs)
+        print(f"Aligned {name} of {len(aligned.filenames)} file(s) on {aligned.values.shape[2]} steps of {aligned.step} s")
+    return list(errors.items())
 
-def main():
-    reader = DataReader(DATAFRAMES)
+def follow_batch(input_paths, output_dir, names, rmod_input='', antenna_input='', interval=FOLLOW_INTERVAL_S, include_plotlyjs='cdn', rounds=None):
+    '''
+    follow_batch: Live view of exports which are still being written. The plots are written as self reloading html files
+    into output_dir and the files are checked every interval seconds. Only the new timestamp columns are read and appended
+    to the traces. Runs until interrupted with Ctrl+C, or for the given number of rounds
+
+    param: input_paths; list of strings, paths to exports or directories containing exports
+    param: output_dir; string, the directory for the html files, created if missing
+    param: names; list of strings, the sections to plot
+    param: rmod_input; string, radio filter in the same format as in the GUI
+    param: antenna_input; string, antenna filter in the same format as in the GUI
+    param: interval; number, seconds between the checks
+    param: include_plotlyjs; passed to plotly write_html
+    param: rounds; int, the number of checks, None to run until interrupted
+    '''
+    file_paths, rmod_filter, rmod_to_antenna = prepare_batch(input_paths, output_dir, rmod_input, antenna_input)
+    parsers = {filename_path: AntennaLineParser(DATAFRAMES, converted_dir=None) for filename_path in file_paths} # One parser per file, same named files must not mix
+    base_names = output_base_names(file_paths)
+    figures = {} # (path, section name) -> figure
+    round_number = 0
+    try:
+        while rounds is None or round_number < rounds:
+            for filename_path, parser in parsers.items():
+                filename = parser.process_filename(parser.extract_filename(filename_path))
+                base_name = base_names[filename_path]
+                try:
+                    changes = parser.refresh_file(filename_path, filename, names)
+                except Exception as e: # The file may be missing or in the middle of being written, try again on the next round
+                    print(f"Could not refresh the file {filename_path}: {e}", file=sys.stderr)
+                    continue
+                for name in names:
+                    if name not in changes:
+                        continue
+                    fig = figures.get((filename_path, name))
+                    if fig is None or not parser.extend_figure(fig, name, [filename], rmod_filter, rmod_to_antenna, {filename: changes}):
+                        fig = parser.build_figure(name, [filename], rmod_filter, rmod_to_antenna)
+                    if fig is None:
+                        continue
+                    figures[(filename_path, name)] = fig
+                    write_live_html(fig, os.path.join(output_dir, f"{base_name}_{name}.html"), interval, include_plotlyjs)
+                if changes:
+                    print(f"Refreshed {filename_path}")
+            round_number += 1
+            if rounds is None or round_number < rounds:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Antennaline data visualizer. Starts the GUI when no files are given.")
+    parser.add_argument('inputs', nargs='*', help="Export files or directories to process in batch mode")
+    parser.add_argument('-o', '--output', default='output', help="Output directory for the batch mode (default: output)")
+    parser.add_argument('-m', '--metrics', default=','.join(DATAFRAMES), help="Comma separated sections to write (default: all)")
+    parser.add_argument('-r', '--radios', default='', help="Radio filter, same format as in the GUI e.g. '1,4,5'")
+    parser.add_argument('-a', '--antennas', default='', help="Antenna filter, same format as in the GUI e.g. '1,2;2,3'")
+    parser.add_argument('-c', '--converted-dir', default=CONVERTED_DIR,
+                        help="Directory for the converted binary copies of the exports, opening a converted export again skips the parsing (default: $ANTL_CONVERTED_DIR)")
+    parser.add_argument('-j', '--workers', type=int, default=LOAD_WORKERS,
+                        help=f"Number of files loaded concurrently in worker processes (default: {LOAD_WORKERS}, $ANTL_LOAD_WORKERS)")
+    parser.add_argument('--analyze', action='store_true',
+                        help=f"Write a statistics report ({REPORT_FILENAME}) of the exports into the output directory instead of the plots")
+    parser.add_argument('-l', '--limit', action='append', default=[],
+                        help="Analysis limit in the plotted units, can be given several times e.g. 'VSWR:max=1.4' or 'ETP:min=0.5' (defaults: "
+                             + ', '.join(f"{name}:" + ','.join(f"{key}={value}" for key, value in name_limits.items()) for name, name_limits in ANALYSIS_LIMITS.items()) + ")")
+    parser.add_argument('--follow', action='store_true',
+                        help="Keep checking the exports for new data and update self reloading html plots in the output directory until Ctrl+C")
+    parser.add_argument('--interval', type=float, default=FOLLOW_INTERVAL_S,
+                        help=f"Seconds between the checks in the follow mode (default: {FOLLOW_INTERVAL_S}, $ANTL_FOLLOW_INTERVAL)")
+    parser.add_argument('--align', action='store_true',
+                        help="Resample the exports onto one time grid and write the aligned values of all the files as aligned_<section>.csv and .html")
+    parser.add_argument('--step', type=int, default=ALIGN_STEP_S, help=f"Grid step in seconds for --align (default: {ALIGN_STEP_S}, $ANTL_ALIGN_STEP)")
+    parser.add_argument('--relative', action='store_true', help="With --align, align the files on their first samples instead of the clock time")
+    parser.add_argument('--diff', action='store_true', help="With --align, write the differences of the other files to the first file")
+    parser.add_argument('--embed-plotlyjs', action='store_true', help="Embed plotly.js into the html files for offline viewing")
+    parser.add_argument('--profile', default=PROFILE_PATH, metavar='JSON',
+                        help="Record the time, rows, columns and peak memory of each stage and file into this json file (default: $ANTL_PROFILE)")
+    parser.add_argument('--cprofile', default=CPROFILE_PATH, metavar='FILE',
+                        help="Write the cProfile statistics of the whole run into this file, view them with python -m pstats (default: $ANTL_CPROFILE)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.profile:
+        PROFILER.enable()
+    profile = cProfile.Profile() if args.cprofile else None
+    if profile is not None:
+        profile.enable()
+    try:
+        return run_arguments(args)
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(args.cprofile)
+        if args.profile and args.inputs: # The GUI writes its profile after each plot
+            PROFILER.write_json(args.profile)
+            print(PROFILER.report(), file=sys.stderr)
+
+def run_arguments(args): # Runs the GUI or the batch, analysis or follow mode given by the parsed arguments, returns the exit code
+    if not args.inputs:
+        try:
+            import_tk()
+        except ImportError:
+            print("tkinter is not available, give the files to process as arguments", file=sys.stderr)
+            return 1
+        reader = DataReader(DATAFRAMES, max(1, args.workers), args.profile)
+        return 0
+
+    names = [name.strip().upper() for name in args.metrics.split(',') if name.strip()]
+    unknown = [name for name in names if name not in DATAFRAMES]
+    if unknown:
+        print(f"Unknown metric(s): {', '.join(unknown)}, choose from {', '.join(DATAFRAMES)}", file=sys.stderr)
+        return 2
+    try: # The filters are checked before any file is read, the modes parse them again from the strings
+        parse_filter_strings(args.radios, args.antennas)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.follow:
+        follow_batch(args.inputs, args.output, names, args.radios, args.antennas, args.interval, True if args.embed_plotlyjs else 'cdn')
+        return 0
+    if args.align:
+        failed = run_alignment(args.inputs, args.output, names, args.step, args.relative, args.diff, args.radios, args.antennas,
+                               True if args.embed_plotlyjs else 'cdn', args.converted_dir, max(1, args.workers))
+        return 1 if failed else 0
+    if args.analyze:
+        try:
+            limits = parse_limit_strings(args.limit)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        report, failed = run_analysis(args.inputs, args.output, names, limits, args.radios, args.antennas, args.converted_dir, max(1, args.workers))
+        flagged_count = int(report['flagged'].sum()) if 'flagged' in report else 0
+        print(f"Analyzed {len(report)} rows, {flagged_count} flagged, report written to {os.path.join(args.output, REPORT_FILENAME)}")
+        return 1 if failed else 0
+    failed = run_batch(args.inputs, args.output, names, args.radios, args.antennas, True if args.embed_plotlyjs else 'cdn', args.converted_dir, max(1, args.workers))
+    return 1 if failed else 0
 
 if __name__=="__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
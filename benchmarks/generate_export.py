@@ -0,0 +1,152 @@
+# Synthetic antenna line export generator for the benchmarks
+
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime, timedelta
+import numpy as np
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+
+SECTION_TITLES = {'VSWR': 'VSWR', 'RTWP': 'RTWP (dBm)', 'RSSI': 'RSSI (dBm)', 'ETP': 'ETP (mW)'}
+SECTION_HEADERS = {
+    'VSWR': ['Radio module', 'Antenna/Port', 'Supported TX bands'],
+    'RTWP': ['Radio module', 'Antenna/Port', 'RX carrier'],
+    'RSSI': ['Radio module', 'Antenna/Port', 'RX carrier'],
+    'ETP': ['Radio module', 'Cells'],
+}
+BANDS = ['B8, n8', 'B20, n20', 'B28, n28', 'B1, n1', 'B3, n3', 'B7, n7']
+FILENAME_PREFIX = 'ANTL_data_from_' # process_filename takes the BTS id and the time from the characters after the 15 first
+
+def export_filename(bts_id, start, extension): # The ANTL filename pattern which process_filename expects, e.g. ANTL_data_from_12345_20230731_1045.csv
+    return f"{FILENAME_PREFIX}{bts_id}_{start.strftime('%Y%m%d_%H%M')}{extension}"
+
+def section_rows(name, radios, antennas, bands, carriers): # Returns the metadata rows of a section in the order of the exports
+    rows = []
+    for radio in range(1, radios + 1):
+        module = f"RMOD-{radio}/RMOD_R-{radio}(AHPMDD)"
+        if name == 'ETP':
+            rows.append([module, f"NRCELL-{radio}(N1197A{radio})"])
+            continue
+        for antenna in range(1, antennas + 1):
+            if name == 'VSWR':
+                rows.extend([module, f"ANT{antenna}", BANDS[band % len(BANDS)]] for band in range(bands))
+            else:
+                rows.extend([module, f"ANT{antenna}", f"LNCEL-{radio * 10 + carrier}(L1197B{carrier})"] for carrier in range(1, carriers + 1))
+    return rows
+
+def section_values(name, row_count, columns, gap_fraction, rng):
+    '''
+    section_values: Random measurements in the typical ranges of the section, nan marks the '-' cells
+
+    Some rows have no values at all (a band or carrier which is not in use), the others have short gaps and a few spikes
+    '''
+    base = {'VSWR': (1.15, 0.03), 'RTWP': (-100.0, 1.5), 'RSSI': (-80.0, 3.0), 'ETP': (500.0, 30.0)}[name]
+    values = rng.normal(base[0], base[1], size=(row_count, columns))
+    spikes = rng.random((row_count, columns)) < 0.001 # VSWR spikes, RTWP interference bursts, ETP peaks
+    values[spikes] += {'VSWR': 0.8, 'RTWP': 40.0, 'RSSI': 30.0, 'ETP': 20000.0}[name]
+    values = np.round(values, 0 if name == 'ETP' else 1)
+    if gap_fraction > 0:
+        gap_starts = rng.random((row_count, columns)) < gap_fraction / 10 # Gaps of about ten samples
+        gaps = np.zeros_like(gap_starts)
+        for shift in range(min(10, columns)):
+            gaps[:, shift:] |= gap_starts[:, :columns - shift]
+        values[gaps] = np.nan
+        values[rng.random(row_count) < gap_fraction] = np.nan # Rows without any values
+    return values
+
+def format_values(values, decimal_comma): # Formats the value matrix as the cells of an export, '-' for the missing values
+    cells = np.char.mod('%g', values)
+    if decimal_comma:
+        cells = np.char.replace(cells, '.', ',')
+    cells[np.isnan(values)] = '-'
+    return cells
+
+def text_cell(sheet, value): # openpyxl would store '="31.07.2023 10:45:35"' as a formula, the exports have it as text
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.data_type = 's'
+    return cell
+
+def generate_export(output_dir, radios=3, antennas=4, bands=2, carriers=3, hours=1.0, interval=10, gap_fraction=0.05,
+                    empty_sections=(), file_format='csv', raw=True, bts_id=12345, start=datetime(2023, 7, 31, 10, 45, 35), seed=0):
+    '''
+    generate_export: Writes a synthetic export in the WebEM layout: a title line for each section, the header row with the
+    timestamps, the data rows and a blank line between the sections
+
+    param: output_dir; string, directory of the file, created if missing
+    param: radios, antennas, bands, carriers; ints, the number of radio modules, antennas per radio, VSWR bands per antenna
+                                              and RTWP/RSSI carriers per antenna
+    param: hours; float, the length of the capture
+    param: interval; int, seconds between the samples
+    param: gap_fraction; float, the share of rows without values and about the share of '-' cells in the other rows
+    param: empty_sections; list of strings, sections written as 'No data available'
+    param: file_format; 'csv' or 'xlsx'
+    param: raw; boolean, csv only. True writes the raw WebEM form (commas, ="dd.mm.yyyy hh:mm:ss" headers, decimal points),
+                False the form saved again from Excel (semicolons, plain timestamps, decimal commas)
+    param: bts_id; int, the BTS id in the filename
+    param: start; datetime, the first timestamp
+    param: seed; int, the random seed, the same arguments give the same file
+
+    Returns the path of the written file
+    '''
+    rng = np.random.default_rng(seed)
+    columns = max(int(hours * 3600 / interval), 1)
+    timestamps = [(start + timedelta(seconds=interval * column)).strftime('%d.%m.%Y %H:%M:%S') for column in range(columns)]
+    if file_format == 'xlsx' or raw:
+        timestamps = [f'="{timestamp}"' for timestamp in timestamps]
+
+    lines = [] # Lists of cells
+    for name in SECTION_TITLES:
+        lines.append([SECTION_TITLES[name]])
+        if name in empty_sections:
+            lines.append(['No data available'])
+        else:
+            rows = section_rows(name, radios, antennas, bands, carriers)
+            values = section_values(name, len(rows), columns, gap_fraction, rng)
+            lines.append(SECTION_HEADERS[name] + timestamps)
+            if file_format == 'xlsx':
+                cells = values.astype(object)
+                cells[np.isnan(values)] = '-'
+            else:
+                cells = format_values(values, decimal_comma=not raw)
+            lines.extend(row + list(row_cells) for row, row_cells in zip(rows, cells))
+        lines.append([])
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, export_filename(bts_id, start, '.' + file_format))
+    if file_format == 'xlsx':
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for line in lines:
+            sheet.append([text_cell(sheet, value) if isinstance(value, str) and value.startswith('=') else value for value in line])
+        workbook.save(path)
+    else:
+        if not raw: # Excel pads every line to the width of the widest one
+            width = max(len(line) for line in lines)
+            lines = [line + [''] * (width - len(line)) for line in lines]
+        with open(path, 'w', newline='', encoding='utf-8-sig') as file:
+            csv.writer(file, delimiter=',' if raw else ';').writerows(lines)
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writes a synthetic antenna line export in the WebEM layout")
+    parser.add_argument('output_dir')
+    parser.add_argument('--radios', type=int, default=3)
+    parser.add_argument('--antennas', type=int, default=4)
+    parser.add_argument('--bands', type=int, default=2)
+    parser.add_argument('--carriers', type=int, default=3)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--gap-fraction', type=float, default=0.05)
+    parser.add_argument('--empty', default='', help="Comma separated sections written as 'No data available', e.g. RSSI,ETP")
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+    parser.add_argument('--excel-csv', action='store_true', help="Write the csv as saved again from Excel (semicolons, decimal commas)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    empty = [name.strip().upper() for name in args.empty.split(',') if name.strip()]
+    print(generate_export(args.output_dir, args.radios, args.antennas, args.bands, args.carriers, args.hours, gap_fraction=args.gap_fraction,
+                          empty_sections=empty, file_format=args.format, raw=not args.excel_csv, seed=args.seed))
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
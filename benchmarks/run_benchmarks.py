@@ -0,0 +1,176 @@
+# Benchmarks of the antenna line reader stages on synthetic exports
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Antenna_line_data_reader as reader
+from generate_export import generate_export
+
+# Sizes of the synthetic exports, the large one is about a two day capture of a big site
+SIZES = {
+    'small': dict(radios=3, antennas=4, bands=2, carriers=3, hours=1),
+    'medium': dict(radios=6, antennas=4, bands=2, carriers=3, hours=8),
+    'large': dict(radios=12, antennas=4, bands=3, carriers=4, hours=48),
+}
+DEFAULT_SIZES = ['small', 'medium']
+REGRESSION_TOLERANCE = 0.25 # A stage is a regression when it is this much slower than in the baseline
+REGRESSION_MIN_SECONDS = 0.005 # Differences below this are timer noise
+
+class SplitOnlyParser(reader.AntennaLineParser): # Runs the section splitter but keeps the cells as they are, for timing the split alone
+    def make_section(self, name, header, rows, previous=None):
+        return list(header), [list(row) for row in rows]
+
+def measure(function, repeats):
+    '''
+    measure: Runs the function repeats times for the best wall time and once more under tracemalloc for the peak memory
+
+    Returns (result, seconds, peak_bytes)
+    '''
+    seconds = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak_bytes
+
+def export_paths(data_dir, size): # Generates the csv and xlsx exports of the size once, later runs reuse them
+    size_dir = os.path.join(data_dir, size + '_' + '_'.join(f"{key}{value}" for key, value in SIZES[size].items()))
+    paths = {}
+    for file_format in ['csv', 'xlsx']:
+        existing = [name for name in os.listdir(size_dir) if name.endswith('.' + file_format)] if os.path.isdir(size_dir) else []
+        if existing:
+            paths[file_format] = os.path.join(size_dir, existing[0])
+        else:
+            paths[file_format] = generate_export(size_dir, file_format=file_format, empty_sections=['RSSI'], **SIZES[size])
+    return paths
+
+def benchmark_size(size, data_dir, repeats, include_xlsx):
+    '''
+    benchmark_size: Times the stages on the exports of one size
+
+    Returns a dict of {'seconds', 'peak_bytes', 'rows', 'columns'} by the stage name
+    '''
+    paths = export_paths(data_dir, size)
+    names = reader.DATAFRAMES
+    results = {}
+    def record(stage, function):
+        result, seconds, peak_bytes = measure(function, repeats)
+        results[stage] = {'seconds': seconds, 'peak_bytes': peak_bytes, 'rows': rows, 'columns': columns}
+        print(f"  {stage:<16} {seconds * 1000:10.1f} ms {peak_bytes / 2**20:10.1f} MiB")
+        return result
+
+    parser = reader.AntennaLineParser(names, converted_dir=None)
+    sections = parser.read_sections(paths['csv'], names)
+    rows = int(sum(section.values.shape[0] for section in sections.values()))
+    columns = int(max(section.values.shape[1] for section in sections.values()))
+    print(f"{size}: {rows} rows, {columns} timestamps, {os.path.getsize(paths['csv']) / 2**20:.1f} MiB csv")
+
+    split = record('split', lambda: SplitOnlyParser(names, converted_dir=None).read_sections(paths['csv'], names))
+    def convert():
+        for name, (header, section_rows) in split.items():
+            start = reader.metadata_column_count(name)
+            reader.to_float_matrix([row[start:] for row in section_rows], reader.VALUE_DTYPE)
+            reader.parse_timestamps(header[start:])
+    record('convert', convert)
+    value_rows = [[row[reader.metadata_column_count(name):] for row in section_rows] for name, (header, section_rows) in split.items()]
+    record('convert_values', lambda: [reader.to_float_matrix(rows, reader.VALUE_DTYPE) for rows in value_rows])
+    # The plain per cell loop, convert_values must not be slower than this
+    record('convert_loop', lambda: [np.array([[np.nan if cell in ('-', '') else float(cell.replace(',', '.')) for cell in row] for row in rows],
+                                             dtype=reader.VALUE_DTYPE).reshape(len(rows), -1) for rows in value_rows])
+    record('parse_csv', lambda: parser.read_sections(paths['csv'], names))
+    if include_xlsx:
+        record('parse_xlsx', lambda: parser.read_sections(paths['xlsx'], names))
+
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        record('save_converted', lambda: reader.save_sections(bundle_dir, sections, sections.keys(), reader.file_signature(paths['csv'])))
+        record('load_converted', lambda: reader.load_sections(bundle_dir))
+
+    parser.dataframe_dict = {'benchmark': sections}
+    def time_axes():
+        for section in sections.values():
+            section.time_axis = None
+            parser.get_data_details(section, section.name)
+    record('time_axis', time_axes)
+    record('filter', lambda: [list(section.select_rows([1, 2], {1: [1, 2]})) for section in sections.values()])
+    record('figure', lambda: [parser.build_figure(name, ['benchmark'], [], {}) for name in sections])
+    record('analysis', lambda: [reader.section_statistics(section, reader.ANALYSIS_LIMITS.get(name)) for name, section in sections.items()])
+    return results
+
+def find_regressions(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    '''
+    find_regressions: Compares the stage times with a baseline saved by an earlier run
+
+    Returns a list of (size, stage, baseline seconds, seconds) of the stages which got slower than the tolerance allows
+    '''
+    regressions = []
+    for size, stages in results['sizes'].items():
+        for stage, result in stages.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(stage)
+            if previous is None:
+                continue
+            if result['seconds'] > previous['seconds'] * (1 + tolerance) and result['seconds'] - previous['seconds'] > REGRESSION_MIN_SECONDS:
+                regressions.append((size, stage, previous['seconds'], result['seconds']))
+    return regressions
+
+def find_slow_conversions(results, tolerance=REGRESSION_TOLERANCE): # Returns the sizes where the vectorized conversion is slower than the plain loop
+    return [(size, stages['convert_loop']['seconds'], stages['convert_values']['seconds']) for size, stages in results['sizes'].items()
+            if stages['convert_values']['seconds'] > stages['convert_loop']['seconds'] * (1 + tolerance) + REGRESSION_MIN_SECONDS]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times and memory profiles the antenna line reader stages on synthetic exports")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help=f"Comma separated sizes from {', '.join(SIZES)} (default: {','.join(DEFAULT_SIZES)})")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per stage, the best time is kept (default: 3)")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'antl_benchmark_data'), help="Directory for the generated exports, reused between runs")
+    parser.add_argument('--no-xlsx', action='store_true', help="Skip the xlsx parsing, which is the slowest stage")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="Where the results are saved (default: benchmark_results.json)")
+    parser.add_argument('--baseline', help="Results of an earlier run, the exit code is 1 if a stage got slower")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help=f"Allowed slowdown against the baseline (default: {REGRESSION_TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        print(f"Unknown size(s): {', '.join(unknown)}, choose from {', '.join(SIZES)}", file=sys.stderr)
+        return 2
+
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'numpy': np.__version__, 'pandas': pd.__version__},
+        'sizes': {size: benchmark_size(size, args.data_dir, max(1, args.repeats), not args.no_xlsx) for size in sizes},
+    }
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {args.output}")
+
+    slow = find_slow_conversions(results, args.tolerance)
+    for size, loop_seconds, seconds in slow:
+        print(f"Slow conversion: {size} to_float_matrix {seconds * 1000:.1f} ms, the plain loop {loop_seconds * 1000:.1f} ms", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for size, stage, previous, seconds in regressions:
+            print(f"Regression: {size} {stage} {previous * 1000:.1f} ms -> {seconds * 1000:.1f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 1 if slow else 0
+
+if __name__=="__main__":
+    sys.exit(main())